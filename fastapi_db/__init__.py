@@ -1,8 +1,9 @@
 from .types import Page, IPage
 from .transaction_enums import Propagation, Isolation
 from .middleware import FastAPIDBMiddleware
-from .extensions import (FastAPIDB, TransactionContext, local_transaction, set_transaction_context,
-                         get_transaction_context, transactional, transaction_pop, ctx)
+from .extensions import (FastAPIDB, AsyncFastAPIDB, TransactionContext, local_transaction, set_transaction_context,
+                         get_transaction_context, transactional, atransactional, transaction_pop, atransaction_pop,
+                         ctx)
 from .models import (DeclarativeModel, CRUDModel, Model, TimeMixin, AbstractTimeMixin, OperateMixin,
                      AbstractOperateMixin)
 
@@ -11,12 +12,15 @@ __all__ = [
     'Isolation',
     'FastAPIDBMiddleware',
     'FastAPIDB',
+    'AsyncFastAPIDB',
     'TransactionContext',
     'local_transaction',
     'set_transaction_context',
     'get_transaction_context',
     'transactional',
+    'atransactional',
     'transaction_pop',
+    'atransaction_pop',
     'ctx',
     'DeclarativeModel',
     'CRUDModel',
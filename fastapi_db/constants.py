@@ -11,6 +11,11 @@ _SESSION_MISSING_MESSAGE = '未找到上下文Session对象，请检查是否正
 
 Columns = Optional[Union[Tuple[InstrumentedAttribute, ...], InstrumentedAttribute]]
 
+Relationships = Optional[Union[Tuple[InstrumentedAttribute, ...], InstrumentedAttribute]]
+
+"""PostgreSQL批量插入时达到该行数使用COPY写入"""
+COPY_THRESHOLD = 500
+
 
 class IdStrategy(enum.IntEnum):
 
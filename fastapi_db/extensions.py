@@ -1,16 +1,20 @@
+import logging
+import os
+import warnings
 from contextvars import ContextVar
-from functools import wraps
-from typing import Optional, Union, Callable, Any
+from typing import Optional, Union, Callable, Any, Tuple, Dict
 
 from fastapi import FastAPI
-from fastapi.requests import Request
-from sqlalchemy import Engine, URL, create_engine, text
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import Engine, URL, create_engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker, Session, configure_mappers
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .constants import _SESSION_MISSING_MESSAGE
 from .exceptions import SessionInitError, SessionContextError
 from .transaction_enums import Propagation, Isolation
-from .utils import _deserialize_enum
+from .utils import _deserialize_enum, _make_wrapper
 
 """
 声明式事务线程并且支持局部上下文 | 参考了decimal的源代码实现
@@ -20,22 +24,65 @@ decimal: https://github.com/python/cpython/blob/af2b8f6845e31dd6ab3bb0bac41b19a0
 邮箱：chinadlay@163.com
 """
 
+logger = logging.getLogger(__name__)
+
 _extensions: Optional['FastAPIDB'] = None
-_transaction_context: ContextVar['TransactionContext'] = ContextVar('fastapi_db')
+"""事务上下文栈，栈顶为当前事务，加入上级事务时复用上级上下文入栈"""
+_transaction_context: ContextVar[Tuple['TransactionContext', ...]] = ContextVar('fastapi_db', default=())
+
+
+def _needs_commit(session: Union[Session, AsyncSession]) -> bool:
+    """从未开始事务（未使用过）的会话无需提交，其余情况包括直接通过连接写入都需要提交"""
+    return session.in_transaction()
 
 
-def _check_init():
+def _require_init():
     if _extensions is None:
         from .middleware import FastAPIDBMiddleware
         raise SessionInitError(f'请先添加 `{FastAPIDBMiddleware.__name__}` 中间件'
                                f'或初始化 `{FastAPIDB.__name__}` 扩展')
 
 
+def _initialized():
+    """扩展初始化后_check_init替换为该函数，热路径上不再检查"""
+
+
+_check_init = _require_init
+
+
+def _peek_context() -> Optional['TransactionContext']:
+    """获取事务上下文，不存在时返回None而不是抛出异常"""
+    stack = _transaction_context.get()
+    return stack[-1] if stack else None
+
+
 class FastAPIDB:
-    """FastAPI数据库扩展"""
+    """
+    FastAPI数据库扩展
+
+    通过datasource_url创建引擎时会使用以下连接池默认值，engine_kwargs中的同名参数优先：
+    :param pool_size: 连接池大小，100~500并发客户端时25~50较为合适
+    :param max_overflow: 连接池溢出数量
+    :param pool_timeout: 获取连接超时时间（秒）
+    :param pool_pre_ping: 取出连接前检测连接是否可用
+    :param pool_recycle: 连接回收时间（秒）
+    :param pool_use_lifo: 后进先出取连接，流量低谷时只使用少量热连接，空闲连接可以尽快回收
+    :param insertmanyvalues_page_size: 批量插入时每条多行INSERT语句包含的行数
+
+    :param debug_query_count_threshold: 开发调试用，一个事务的查询次数超过该值时输出警告和调用栈，用于发现N+1查询
+
+    设置环境变量FASTAPI_DB_CONFIGURE_MAPPERS=1时，扩展初始化即配置所有模型映射，避免首个请求承担配置开销，
+    此时需要在导入所有模型之后再初始化扩展
 
+    引擎应当每个进程一个、会话每个请求一个：相同datasource_url的扩展复用同一个引擎，
+    重复创建的扩展不会再创建新的连接池，此时只有第一次的引擎参数生效，引擎参数不同时给出警告
+    """
+
+    is_async: bool = False
     engine: Optional[Engine] = None
     session_factory: Optional[sessionmaker] = None
+    """进程内的引擎缓存，键为(是否异步, 数据源地址)，值为(引擎, 创建引擎时合并后的参数)"""
+    _engine_cache: Dict[Tuple[bool, str], Tuple[Engine, dict]] = {}
 
     def __init__(
         self,
@@ -48,6 +95,14 @@ class FastAPIDB:
         worker_id: int = 0,
         datacenter_id: int = 0,
         epoch: int = 1288834974,
+        pool_size: int = 20,
+        max_overflow: int = 10,
+        pool_timeout: int = 30,
+        pool_pre_ping: bool = True,
+        pool_recycle: int = 3600,
+        pool_use_lifo: bool = True,
+        insertmanyvalues_page_size: int = 1000,
+        debug_query_count_threshold: Optional[int] = None,
     ) -> None:
         self.app = app
         self.datasource_url = datasource_url
@@ -55,6 +110,14 @@ class FastAPIDB:
         self.autocommit = autocommit
         self.engine_kwargs = engine_kwargs or {}
         self.session_kwargs = session_kwargs or {}
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_pre_ping = pool_pre_ping
+        self.pool_recycle = pool_recycle
+        self.pool_use_lifo = pool_use_lifo
+        self.insertmanyvalues_page_size = insertmanyvalues_page_size
+        self.debug_query_count_threshold = debug_query_count_threshold
         self.worker_id = worker_id
         self.datacenter_id = datacenter_id
         self.epoch = epoch
@@ -63,65 +126,244 @@ class FastAPIDB:
             raise RuntimeError('您需要传递一个datasource_url或一个引擎参数。')
 
         if not engine:
-            self.engine = create_engine(datasource_url, **self.engine_kwargs)
+            self.engine = self.get_or_create_engine()
         else:
             self.engine = engine
 
-        self.session_factory = sessionmaker(bind=self.engine, **self.session_kwargs)
+        self.session_factory = self.create_session_factory()
+
+        """同一个引擎只注册一次监听，阈值在执行时从全局扩展读取"""
+        if debug_query_count_threshold is not None and not event.contains(
+                self.sync_engine, 'before_cursor_execute', _count_query):
+            event.listen(self.sync_engine, 'before_cursor_execute', _count_query)
 
         from .snowflake import Snowflake
         self.snowflake = Snowflake(datacenter_id=datacenter_id, worker_id=worker_id)
-        global _extensions
+        global _extensions, _check_init
+        if _extensions is not None and _extensions is not self:
+            warnings.warn(f'`{type(_extensions).__name__}` 扩展已经初始化，重复创建会覆盖全局扩展，'
+                          f'请确保每个进程只创建一个扩展', RuntimeWarning, stacklevel=2)
         _extensions = self
+        _check_init = _initialized
+        _bind_proxy(self)
+
+        if os.environ.get('FASTAPI_DB_CONFIGURE_MAPPERS', '').lower() in ('1', 'true', 'yes'):
+            configure_mappers()
 
         if app is not None:
             self.init_app(app)
 
+    def get_or_create_engine(self) -> Engine:
+        """获取缓存的引擎，相同数据源在进程内只创建一个连接池"""
+        key = (self.is_async, make_url(self.datasource_url).render_as_string(hide_password=False))
+        cached = self._engine_cache.get(key)
+        if cached is None:
+            engine = self.create_engine()
+            self._engine_cache[key] = (engine, self.build_engine_kwargs())
+            return engine
+        engine, engine_kwargs = cached
+        if engine_kwargs != self.build_engine_kwargs():
+            warnings.warn(f'数据源 {make_url(self.datasource_url)!r} 已经创建引擎，本次的引擎参数不会生效，'
+                          f'复用引擎的参数为 {engine_kwargs!r}', RuntimeWarning, stacklevel=3)
+        return engine
+
+    def create_engine(self) -> Engine:
+        """创建引擎"""
+        return create_engine(self.datasource_url, **self.build_engine_kwargs())
+
+    def build_engine_kwargs(self) -> dict:
+        """合并连接池和批量执行默认值，用户传递的engine_kwargs优先"""
+        url = make_url(self.datasource_url)
+        dialect = url.get_dialect(_is_async=self.is_async)
+        engine_kwargs = {'insertmanyvalues_page_size': self.insertmanyvalues_page_size}
+        """psycopg2的executemany合并为多行VALUES，UPDATE和DELETE使用execute_batch"""
+        if dialect.name == 'postgresql' and dialect.driver == 'psycopg2':
+            engine_kwargs['executemany_mode'] = 'values_plus_batch'
+
+        if 'pool' not in self.engine_kwargs:
+            engine_kwargs.update(pool_pre_ping=self.pool_pre_ping, pool_recycle=self.pool_recycle)
+            poolclass = self.engine_kwargs.get('poolclass') or dialect.get_pool_class(url)
+            """内存数据库等非队列连接池不支持以下参数"""
+            if issubclass(poolclass, QueuePool):
+                engine_kwargs.update(
+                    pool_size=self.pool_size,
+                    max_overflow=self.max_overflow,
+                    pool_timeout=self.pool_timeout,
+                    pool_use_lifo=self.pool_use_lifo
+                )
+        engine_kwargs.update(self.engine_kwargs)
+        return engine_kwargs
+
+    def create_session_factory(self) -> sessionmaker:
+        """创建会话工厂，每个事务上下文创建自己的会话"""
+        return sessionmaker(bind=self.engine, **self.session_kwargs)
+
+    @property
+    def sync_engine(self) -> Engine:
+        """同步引擎，异步扩展为异步引擎代理的同步引擎"""
+        return self.engine.sync_engine if self.is_async else self.engine
+
     def init_app(self, app: FastAPI) -> None:
         self.app = app
+        """中间件只按值保存配置，应用不持有扩展的引用"""
+        app.add_middleware(FastAPIDBASGIMiddleware, autocommit=self.autocommit)
+
+    def dispose(self) -> None:
+        """释放引擎连接池并解除全局扩展，用于测试清理或重新初始化"""
+        self.engine.dispose()
+        self._detach()
+
+    def _detach(self) -> None:
+        """移除引擎缓存，当前扩展为全局扩展时恢复未初始化状态"""
+        global _extensions, _check_init
+        if event.contains(self.sync_engine, 'before_cursor_execute', _count_query):
+            event.remove(self.sync_engine, 'before_cursor_execute', _count_query)
+        for key, (engine, _) in list(self._engine_cache.items()):
+            if engine is self.engine:
+                del self._engine_cache[key]
+        if _extensions is self:
+            _extensions = None
+            _check_init = _require_init
+            _unbind_proxy()
+
+
+def _count_query(*_) -> None:
+    """统计最外层事务的查询次数，刚超过阈值时输出调用栈以便定位N+1查询"""
+    threshold = None if _extensions is None else _extensions.debug_query_count_threshold
+    stack = _transaction_context.get()
+    if threshold is None or not stack:
+        return
+    context = stack[0]
+    context._query_count += 1
+    if context._query_count == threshold + 1:
+        logger.warning('事务查询次数超过 %s 次，可能存在N+1查询：%r', threshold, context, stack_info=True)
+
+
+class FastAPIDBASGIMiddleware:
+    """请求事务中间件，直接实现ASGI接口，避免BaseHTTPMiddleware每个请求额外的任务和内存流"""
+
+    def __init__(self, app: ASGIApp, autocommit: bool = True) -> None:
+        self.app = app
+        self.autocommit = autocommit
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        async with local_transaction(autocommit=self.autocommit) as transaction_context:
+            transaction_context.source = 'request'
+
+            async def send_wrapper(message: Message) -> None:
+                """响应开始前提交，提交失败时客户端收到的是错误响应"""
+                if (message['type'] == 'http.response.start' and transaction_context.autocommit
+                        and _needs_commit(transaction_context.session)):
+                    if transaction_context.is_async:
+                        await transaction_context.session.commit()
+                    else:
+                        transaction_context.session.commit()
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+class AsyncFastAPIDB(FastAPIDB):
+    """
+    FastAPI异步数据库扩展，会话为AsyncSession，提交和回滚不会阻塞事件循环
+
+    ```python
+    from fastapi import FastAPI
+    from fastapi_db import AsyncFastAPIDB
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    app = FastAPI()
+
+    engine = create_async_engine('sqlite+aiosqlite:///test.db')
+    extension = AsyncFastAPIDB(app, engine=engine)
+    ```
+    """
+
+    is_async: bool = True
+    engine: Optional[AsyncEngine] = None
+    session_factory: Optional[async_sessionmaker] = None
 
-        @app.middleware('http')
-        async def db_session_middleware(request: Request, call_next):
-            with local_transaction(autocommit=self.autocommit):
-                get_transaction_context().source = 'request'
-                return await call_next(request)
+    def create_engine(self) -> AsyncEngine:
+        """创建异步引擎"""
+        return create_async_engine(self.datasource_url, **self.build_engine_kwargs())
+
+    async def dispose(self) -> None:
+        """释放异步引擎连接池并解除全局扩展"""
+        await self.engine.dispose()
+        self._detach()
+
+    def create_session_factory(self) -> async_sessionmaker:
+        """创建异步会话工厂，提交后不过期对象以免隐式IO"""
+        session_kwargs = {'expire_on_commit': False, **self.session_kwargs}
+        return async_sessionmaker(bind=self.engine, **session_kwargs)
 
 
 class FastAPIDBProxy:
     """FastAPIDB代理器（可随时访问）"""
 
+    __slots__ = ()
+
     @property
     def app(self) -> FastAPIDB:
         _check_init()
         return _extensions
 
+    """以默认参数保存上下文变量的get方法，访问时不再查找全局变量"""
+
     @property
-    def session(self) -> Session:
-        transaction_context = get_transaction_context()
-        return transaction_context.session
+    def session(self, _get=_transaction_context.get) -> Session:
+        stack = _get()
+        if not stack:
+            return get_transaction_context().session
+        return stack[-1].session
 
     @property
-    def context(self) -> 'TransactionContext':
-        transaction_context = get_transaction_context()
-        return transaction_context
+    def context(self, _get=_transaction_context.get) -> 'TransactionContext':
+        stack = _get()
+        if not stack:
+            return get_transaction_context()
+        return stack[-1]
+
+
+"""未初始化扩展时代理器的app，释放扩展后恢复"""
+_unbound_app = FastAPIDBProxy.app
+
+
+def _bind_proxy(extension: FastAPIDB) -> None:
+    """初始化扩展后将代理器的app绑定为该扩展"""
+    FastAPIDBProxy.app = property(lambda _, _extension=extension: _extension)
+
+
+def _unbind_proxy() -> None:
+    """释放扩展后代理器的app恢复为未初始化状态"""
+    FastAPIDBProxy.app = _unbound_app
 
 
 class TransactionContext:
     """事务上下文"""
 
+    __slots__ = ('propagation', 'isolation', 'session', 'autocommit', 'is_active_isolation', 'is_super', 'source',
+                 'rollback_callback', 'exception_callback', '_token', '_query_count')
+
     propagation: Propagation
     isolation: Isolation
-    session: Session
+    session: Optional[Union[Session, AsyncSession]]
     autocommit: bool
     rollback_callback: Optional[Callable]
     exception_callback: Optional[Callable]
     is_active_isolation: bool
     is_super: bool
+    source: str
     _token: Any
+    _query_count: int
 
     def __init__(
         self,
-        session: Session,
+        session: Optional[Union[Session, AsyncSession]],
         propagation: Propagation = Propagation.NEW,
         isolation: Isolation = Isolation.DEFAULT,
         autocommit: bool = True,
@@ -129,6 +371,7 @@ class TransactionContext:
         exception_callback: Optional[Callable] = None
     ):
         self._token = None
+        self._query_count = 0
         self.propagation = propagation
         self.isolation = isolation
         self.session = session
@@ -137,14 +380,32 @@ class TransactionContext:
         self.source = 'normal'
         self.rollback_callback = rollback_callback
         self.exception_callback = exception_callback
-        self.is_active_isolation = self.active_isolation(self.isolation)
+        """未绑定的会话和异步会话由事务管理器激活"""
+        self.is_active_isolation = False if session is None or self.is_async else self.active_isolation(self.isolation)
+
+    @property
+    def is_async(self) -> bool:
+        """是否为异步会话"""
+        return isinstance(self.session, AsyncSession)
 
     def active_isolation(self, isolation: Isolation) -> bool:
-        """激活"""
-        if isolation == Isolation.DEFAULT or self.active_isolation:
+        """
+        激活，隔离级别作为连接的执行选项设置，连接归还连接池时恢复默认隔离级别，
+        会话已经取得连接时无法再修改，SQLAlchemy会给出警告
+        """
+        if isolation is Isolation.DEFAULT or getattr(self, 'is_active_isolation', False):
             self.is_active_isolation = True
             return True
-        self.session.execute(text(f"SET SESSION TRANSACTION ISOLATION LEVEL {isolation.value}"))
+        self.session.connection(execution_options={'isolation_level': isolation.value})
+        self.is_active_isolation = True
+        return True
+
+    async def aactive_isolation(self, isolation: Isolation) -> bool:
+        """激活（异步会话）"""
+        if isolation is Isolation.DEFAULT or getattr(self, 'is_active_isolation', False):
+            self.is_active_isolation = True
+            return True
+        await self.session.connection(execution_options={'isolation_level': isolation.value})
         self.is_active_isolation = True
         return True
 
@@ -158,6 +419,9 @@ class TransactionContext:
 class TransactionManager:
     """事务管理器"""
 
+    __slots__ = ('_token', 'extension', 'propagation', 'isolation', 'autocommit', 'rollback_callback',
+                 'exception_callback')
+
     def __init__(
         self,
         propagation: Propagation = Propagation.NEW,
@@ -175,67 +439,136 @@ class TransactionManager:
         self.exception_callback = exception_callback
 
     def __enter__(self) -> TransactionContext:
+        _check_init()
+        if _extensions.is_async:
+            raise RuntimeError('异步扩展请使用 `async with local_transaction()` 开启事务')
+        context = self.build_context()
+        if context._token is not self._token:
+            return context
+        try:
+            context.active_isolation(context.isolation)
+        except Exception as e:
+            self.__exit__(type(e), e, e.__traceback__)
+            raise
+        return context
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        transaction_context = get_transaction_context()
+
+        """加入上级事务时只需出栈，由创建会话的事务提交和关闭"""
+        if transaction_context._token is not self._token:
+            _transaction_context.reset(self._token)
+            return
+
+        """如果有错误自动回滚"""
+        if exc_type is not None:
+            rollback = None
+            if transaction_context.exception_callback is not None:
+                rollback = transaction_context.exception_callback(exc_val)
+            if rollback is not False:
+                transaction_context.session.rollback()
+            if transaction_context.rollback_callback is not None:
+                transaction_context.rollback_callback(exc_val)
+
+        """提交可能也会导致错误"""
+        try:
+            if transaction_context.autocommit and _needs_commit(transaction_context.session):
+                transaction_context.session.commit()
+        except Exception as e:
+            if transaction_context.exception_callback is not None:
+                transaction_context.exception_callback(exc_val)
+            transaction_context.session.rollback()
+            if transaction_context.rollback_callback is not None:
+                transaction_context.rollback_callback(exc_val)
+            raise e
+        finally:
+            _close_top(transaction_context)
+
+    async def __aenter__(self) -> TransactionContext:
+        context = self.build_context()
+        if context._token is not self._token:
+            return context
+        try:
+            if context.is_async:
+                await context.aactive_isolation(context.isolation)
+            else:
+                context.active_isolation(context.isolation)
+        except Exception as e:
+            await self.__aexit__(type(e), e, e.__traceback__)
+            raise
+        return context
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        transaction_context = get_transaction_context()
+
+        """同步会话沿用同步退出"""
+        if not transaction_context.is_async:
+            return self.__exit__(exc_type, exc_val, exc_tb)
+
+        if transaction_context._token is not self._token:
+            _transaction_context.reset(self._token)
+            return
+
+        if exc_type is not None:
+            rollback = None
+            if transaction_context.exception_callback is not None:
+                rollback = transaction_context.exception_callback(exc_val)
+            if rollback is not False:
+                await transaction_context.session.rollback()
+            if transaction_context.rollback_callback is not None:
+                transaction_context.rollback_callback(exc_val)
+
+        try:
+            if transaction_context.autocommit and _needs_commit(transaction_context.session):
+                await transaction_context.session.commit()
+        except Exception as e:
+            if transaction_context.exception_callback is not None:
+                transaction_context.exception_callback(exc_val)
+            await transaction_context.session.rollback()
+            if transaction_context.rollback_callback is not None:
+                transaction_context.rollback_callback(exc_val)
+            raise e
+        finally:
+            await _aclose_top(transaction_context)
+
+    def build_context(self) -> TransactionContext:
+        """
+        构建并进入事务上下文
+        加入上级事务时不创建新的上下文，而是将上级上下文再次入栈
+        """
         _check_init()
         self.extension = _extensions
         self.autocommit = self.extension.autocommit if self.autocommit is None else self.autocommit
-        session = self.build_session(propagation=self.propagation)
+        stack = _transaction_context.get()
+        old_transaction = stack[-1] if stack else None
+        if old_transaction is not None and self.propagation in (Propagation.REQUIRED, Propagation.MANDATORY):
+            self._token = _transaction_context.set(stack + (old_transaction,))
+            return old_transaction
+
         context = TransactionContext(
-            session,
+            None,
             propagation=self.propagation,
             isolation=self.isolation,
             autocommit=self.autocommit,
             rollback_callback=self.rollback_callback,
             exception_callback=self.exception_callback
         )
+        context.is_super = True
+        self.push_context(context)
         try:
-            if self.propagation == Propagation.NEW:
-                context.is_super = True
-            else:
-                get_transaction_context()
-                context.is_super = False
-        except (RuntimeError, SessionContextError):
-            context.is_super = True
-        self._token = set_transaction_context(context=context)
-        context._token = self._token
+            context.session = self.build_session(self.propagation, old_transaction)
+        except Exception:
+            _transaction_context.reset(self._token)
+            raise
         return context
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        transaction_context = get_transaction_context()
-
-        """顶级事务才能移除否则下层会有问题"""
-        if transaction_context.is_super:
-
-            """如果有错误自动回滚"""
-            if exc_type is not None:
-                rollback = None
-                if transaction_context.exception_callback is not None:
-                    rollback = transaction_context.exception_callback(exc_val)
-                if rollback is not False:
-                    transaction_context.session.rollback()
-                if transaction_context.rollback_callback is not None:
-                    transaction_context.rollback_callback(exc_val)
-
-            """提交可能也会导致错误"""
-            try:
-                if transaction_context.autocommit:
-                    transaction_context.session.commit()
-            except Exception as e:
-                if transaction_context.exception_callback is not None:
-                    transaction_context.exception_callback(exc_val)
-                transaction_context.session.rollback()
-                if transaction_context.rollback_callback is not None:
-                    transaction_context.rollback_callback(exc_val)
-                raise e
-
-            transaction_pop(autocommit=False)
+    def push_context(self, context: TransactionContext) -> None:
+        """进入事务上下文"""
+        self._token = set_transaction_context(context=context)
+        context._token = self._token
 
-    def build_session(self, propagation: Propagation):
+    def build_session(self, propagation: Propagation, old_transaction: Optional[TransactionContext]):
         """构建会话"""
-        try:
-            old_transaction: Optional[TransactionContext] = get_transaction_context()
-        except (RuntimeError, SessionContextError):
-            old_transaction: Optional[TransactionContext] = None
-
         if propagation == Propagation.MANDATORY:
             """强制上级事务"""
             if old_transaction is None:
@@ -273,16 +606,16 @@ def local_transaction(
 def get_transaction_context() -> TransactionContext:
     """获取事务上下文"""
     _check_init()
-    try:
-        return _transaction_context.get()
-    except LookupError:
+    stack = _transaction_context.get()
+    if not stack:
         raise SessionContextError(_SESSION_MISSING_MESSAGE)
+    return stack[-1]
 
 
 def set_transaction_context(context: TransactionContext):
     """设置事务上下文"""
     _check_init()
-    return _transaction_context.set(context)
+    return _transaction_context.set(_transaction_context.get() + (context,))
 
 
 def transactional(
@@ -306,46 +639,149 @@ def transactional(
     propagation = _deserialize_enum(Propagation, propagation)
     isolation = _deserialize_enum(Isolation, isolation)
 
+    join = propagation in (Propagation.REQUIRED, Propagation.MANDATORY)
+
+    def enter() -> Optional[TransactionManager]:
+        """加入上级事务时无需事务管理器，返回None直接调用原函数"""
+        transaction_context = _cover_request_transaction(
+            propagation=propagation,
+            isolation=isolation,
+            autocommit=autocommit,
+            rollback_callback=rollback_callback,
+            exception_callback=exception_callback,
+            cover_request_transaction=cover_request_transaction
+        )
+        if transaction_context is not None:
+            transaction_context.active_isolation(transaction_context.isolation)
+        if join and _peek_context() is not None:
+            return None
+        return local_transaction(
+            propagation=propagation,
+            isolation=isolation,
+            autocommit=autocommit,
+            rollback_callback=rollback_callback,
+            exception_callback=exception_callback
+        )
+
+    def decorator(func):
+        return _make_wrapper(func, enter)
+    return decorator
+
+
+def atransactional(
+    propagation: Union[Propagation, str] = Propagation.REQUIRED,
+    isolation: Union[Isolation, str] = Isolation.DEFAULT,
+    autocommit: bool = None,
+    rollback_callback: Callable = None,
+    exception_callback: Callable = None,
+    cover_request_transaction: bool = True
+):
+    """
+    异步事务装饰器 async transactional decorator，用于 async def 函数，参数同 transactional
+    :param propagation: 事务传播级别 Transaction propagation level
+    :param isolation: 事务隔离级别 Transaction isolation level
+    :param autocommit: 是否自动提交事务 Whether to automatically commit the transaction
+    :param rollback_callback: 回滚回调函数 Rollback callback function
+    :param exception_callback: 异常回调函数 Exception callback function
+    :param cover_request_transaction: 覆盖请求事务
+    """
+
+    propagation = _deserialize_enum(Propagation, propagation)
+    isolation = _deserialize_enum(Isolation, isolation)
+
+    join = propagation in (Propagation.REQUIRED, Propagation.MANDATORY)
+
+    async def enter() -> Optional[TransactionManager]:
+        """加入上级事务时无需事务管理器，返回None直接调用原函数"""
+        transaction_context = _cover_request_transaction(
+            propagation=propagation,
+            isolation=isolation,
+            autocommit=autocommit,
+            rollback_callback=rollback_callback,
+            exception_callback=exception_callback,
+            cover_request_transaction=cover_request_transaction
+        )
+        if transaction_context is not None:
+            if transaction_context.is_async:
+                await transaction_context.aactive_isolation(transaction_context.isolation)
+            else:
+                transaction_context.active_isolation(transaction_context.isolation)
+        if join and _peek_context() is not None:
+            return None
+        return local_transaction(
+            propagation=propagation,
+            isolation=isolation,
+            autocommit=autocommit,
+            rollback_callback=rollback_callback,
+            exception_callback=exception_callback
+        )
+
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            _autocommit = ctx.app.autocommit if autocommit is None else autocommit
-            try:
-                transaction_context = get_transaction_context()
-                if cover_request_transaction and transaction_context.source == 'request':
-                    transaction_context.propagation = propagation
-                    transaction_context.isolation = isolation
-                    transaction_context.autocommit = _autocommit
-                    transaction_context.rollback_callback = rollback_callback
-                    transaction_context.exception_callback = exception_callback
-                    transaction_context.active_isolation(transaction_context.isolation)
-            except (RuntimeError, SessionContextError):
-                pass
-            with local_transaction(
-                propagation=propagation,
-                isolation=isolation,
-                autocommit=autocommit,
-                rollback_callback=rollback_callback,
-                exception_callback=exception_callback
-            ):
-                return func(*args, **kwargs)
-        return wrapper
+        return _make_wrapper(func, enter, is_async=True)
     return decorator
 
 
+def _cover_request_transaction(
+    propagation: Propagation,
+    isolation: Isolation,
+    autocommit: Optional[bool],
+    rollback_callback: Optional[Callable],
+    exception_callback: Optional[Callable],
+    cover_request_transaction: bool
+) -> Optional[TransactionContext]:
+    """使用装饰器参数覆盖请求事务，返回被覆盖的事务上下文，隔离级别由调用方激活"""
+    _autocommit = ctx.app.autocommit if autocommit is None else autocommit
+    transaction_context = _peek_context()
+    if transaction_context is None or not cover_request_transaction or transaction_context.source != 'request':
+        return None
+    transaction_context.propagation = propagation
+    """隔离级别改变时需要重新激活"""
+    if transaction_context.isolation is not isolation:
+        transaction_context.isolation = isolation
+        transaction_context.is_active_isolation = False
+    transaction_context.autocommit = _autocommit
+    transaction_context.rollback_callback = rollback_callback
+    transaction_context.exception_callback = exception_callback
+    return transaction_context
+
+
 def transaction_pop(autocommit: Optional[bool] = None):
     """移除事务"""
-    try:
-        transaction_context = get_transaction_context()
-    except (RuntimeError, SessionContextError):
+    transaction_context = _peek_context()
+    if transaction_context is None:
         return None
 
     autocommit = transaction_context.autocommit if autocommit is None else autocommit
-    if autocommit:
+    if autocommit and _needs_commit(transaction_context.session):
         transaction_context.session.commit()
 
+    _close_top(transaction_context)
+
+
+async def atransaction_pop(autocommit: Optional[bool] = None):
+    """移除事务（异步会话）"""
+    transaction_context = _peek_context()
+    if transaction_context is None:
+        return None
+
+    autocommit = transaction_context.autocommit if autocommit is None else autocommit
+    if autocommit and _needs_commit(transaction_context.session):
+        await transaction_context.session.commit()
+
+    await _aclose_top(transaction_context)
+
+
+def _close_top(transaction_context: TransactionContext) -> None:
+    """关闭会话并将事务上下文出栈"""
     transaction_context.session.close()
-    del transaction_context.session
+    transaction_context.session = None
+    _transaction_context.reset(transaction_context._token)
+
+
+async def _aclose_top(transaction_context: TransactionContext) -> None:
+    """关闭会话并将事务上下文出栈（异步会话）"""
+    await transaction_context.session.close()
+    transaction_context.session = None
     _transaction_context.reset(transaction_context._token)
 
 
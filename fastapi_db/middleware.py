@@ -3,13 +3,11 @@ from typing import Optional, Union
 
 from sqlalchemy.engine import Engine
 from sqlalchemy.engine.url import URL
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.middleware.exceptions import ExceptionMiddleware
-from starlette.requests import Request
-from .extensions import FastAPIDB, local_transaction, get_transaction_context
+from starlette.types import ASGIApp
+from .extensions import FastAPIDB, FastAPIDBASGIMiddleware
 
 
-class FastAPIDBMiddleware(BaseHTTPMiddleware):
+class FastAPIDBMiddleware(FastAPIDBASGIMiddleware):
     """
     FastAPIDB 是一个集成了 SQLAlchemy 和 FastAPI 的 Python 库，旨在帮助开发者用简单的方法操作数据库并管理事务从而快速构建高效可维护的应用。
 
@@ -52,15 +50,14 @@ class FastAPIDBMiddleware(BaseHTTPMiddleware):
 
     def __init__(
         self,
-        app: ExceptionMiddleware,
+        app: ASGIApp,
         datasource_url: Optional[Union[str, URL]] = None,
         engine: Optional[Engine] = None,
         engine_kwargs: dict = None,
         session_kwargs: dict = None,
         autocommit: bool = True
     ):
-        super().__init__(app)
-        self.autocommit = autocommit
+        super().__init__(app, autocommit=autocommit)
         self.engine_kwargs = engine_kwargs or {}
         self.session_kwargs = session_kwargs or {}
 
@@ -72,10 +69,9 @@ class FastAPIDBMiddleware(BaseHTTPMiddleware):
             autocommit=autocommit
         )
 
-        fastapi_app = app.app.dependency_overrides_provider  # type: ignore
-        fastapi_app.fastapi_db = self.extension
-
-    async def dispatch(self, request: Request, call_next):
-        with local_transaction(autocommit=self.autocommit):
-            get_transaction_context().source = 'request'
-            return await call_next(request)
\ No newline at end of file
+        """内层中间件的数量随FastAPI版本变化，向内查找路由以获取应用"""
+        router = app
+        while router is not None and not hasattr(router, 'dependency_overrides_provider'):
+            router = getattr(router, 'app', None)
+        if router is not None:
+            router.dependency_overrides_provider.fastapi_db = self.extension
\ No newline at end of file
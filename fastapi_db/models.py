@@ -1,13 +1,16 @@
 import time
-from typing import Type, Union, Dict, List, Optional, Any, Tuple, TypeVar
+import warnings
+from typing import Type, Union, Dict, List, Optional, Any, Tuple, TypeVar, Iterator
 
-from sqlalchemy import Column, BIGINT, event, BigInteger
+from sqlalchemy import (Column, BIGINT, event, BigInteger, func, insert, select, update, delete, bindparam,
+                        inspect as sa_inspect)
 from sqlalchemy.orm import Session, declarative_base, Query, InstrumentedAttribute, make_transient
 
-from .constants import ID, Columns
+from .constants import ID, Columns, Relationships, COPY_THRESHOLD
 from .extensions import ctx
 from .types import IPage
-from .utils import _empty_primary, _build_order_by_query, _build_columns_query, _build_pagination_query
+from .utils import (_empty_primary, _build_pagination_query, _build_eager_query, _build_insert_rows, _supports_copy,
+                    _copy_rows, _supports_window_functions, _coerce_ids, _as_tuple, _check_insert_keys)
 
 _Base = declarative_base()
 _T = TypeVar("_T", bound='DeclarativeModel')
@@ -17,10 +20,34 @@ class DeclarativeModel(_Base):
     """基础模型类，提供了查询和会话的封装"""
     __abstract__ = True
 
+    """映射时缓存的字段列表和首次使用时缓存的主键属性，见_cache_columns"""
+    _pk: Optional[InstrumentedAttribute] = None
+    _columns_list: List[Column] = []
+    """按主键绑定参数的语句，每个模型首次使用时构建，之后复用已缓存的缓存键和编译结果"""
+    _statements: Dict[str, Any] = {}
+    """默认查询实体，每个模型只创建一次"""
+    _default_entities: Tuple[Any, ...] = ()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._default_entities = (cls,)
+
     @classmethod
-    def query(cls: Type[_T], *columns):
-        """查询构造器"""
-        query = cls.session().query(*columns if columns else (cls,))  # type: Query[Type[_T]]
+    def query(cls: Type[_T], *columns, _eager: Relationships = None, _joined: Relationships = None):
+        """
+        查询构造器
+
+        Args:
+            columns: 查询字段列表
+            _eager: 预加载的关系，使用selectinload额外一条IN查询加载，避免N+1查询，支持元祖类型传递
+            _joined: 预加载的关系，使用joinedload在同一条查询中JOIN加载，适合多对一关系，支持元祖类型传递
+
+        Example:
+            User.query(_eager=User.orders).all()
+        """
+        query = cls.session().query(*(columns or cls._default_entities))  # type: Query[Type[_T]]
+        if _eager is not None or _joined is not None:
+            query = _build_eager_query(query, _eager, _joined)
         return query
 
     @classmethod
@@ -31,26 +58,55 @@ class DeclarativeModel(_Base):
     @classmethod
     def columns(cls) -> Dict[str, InstrumentedAttribute]:
         """获取模型列"""
-        return cls.__table__.columns if getattr(cls, '__table__', None) is not None else []  # type: ignore
+        return cls.__table__.columns  # type: ignore
 
     @classmethod
     def column_list(cls) -> List[InstrumentedAttribute]:
         """获取模型字段列表"""
-        return list(cls.columns().values())
+        return cls._columns_list
 
     @classmethod
     def primary_column(cls) -> Union[InstrumentedAttribute[Union[ID]], ID, Any]:
-        """主键列"""
-        if hasattr(cls, 'id') and cls.id.primary_key:
-            return cls.id
-        primary_column: Optional[InstrumentedAttribute[Union[int, str]]] = None
-        for column in cls.column_list():
-            if column.primary_key:
-                primary_column = column
-                break
-        if primary_column is None:
-            raise RuntimeError(f'找不到主键 {cls.__name__}')
-        return primary_column
+        """主键列，返回映射属性，属性名与表的列名不同时也按属性名访问"""
+        if cls._pk is None:
+            mapper = sa_inspect(cls, raiseerr=False)
+            if mapper is None or not mapper.primary_key:
+                raise RuntimeError(f'找不到主键 {cls.__name__}')
+            """映射时属性尚未完成装配，因此在首次使用时才从映射器取得属性；
+            绕过声明式元类的属性赋值，否则映射属性会被当作新的同名列属性加入映射"""
+            type.__setattr__(cls, '_pk', getattr(cls, mapper.get_property_by_column(mapper.primary_key[0]).key))
+        return cls._pk
+
+    @classmethod
+    def _pk_statement(cls, name: str) -> Any:
+        """获取主键语句，主键参数为_id，批量主键参数为_ids"""
+        statement = cls._statements.get(name)
+        if statement is None:
+            primary_column = cls.primary_column()
+            if name == 'get':
+                statement = select(cls).where(primary_column == bindparam('_id'))
+            elif name == 'select_batch':
+                statement = select(cls).where(primary_column.in_(bindparam('_ids', expanding=True)))
+            elif name == 'update':
+                statement = update(cls).where(primary_column == bindparam('_id')).execution_options(
+                    synchronize_session=False)
+            elif name == 'update_batch':
+                statement = update(cls).where(primary_column.in_(bindparam('_ids', expanding=True))).execution_options(
+                    synchronize_session=False)
+            else:
+                """绑定参数无法在会话中求值，通过RETURNING或查询取得删除的主键，同步已加载的对象"""
+                statement = delete(cls).where(primary_column == bindparam('_id')).execution_options(
+                    synchronize_session='fetch')
+            cls._statements[name] = statement
+        return statement
+
+    @classmethod
+    def _execute_update(cls, statement, params: dict) -> int:
+        """数据库支持UPDATE RETURNING时按返回的主键计算更新条数，否则使用rowcount"""
+        session = cls.session()
+        if session.get_bind().dialect.update_returning:
+            return len(session.execute(statement.returning(cls.primary_column()), params).all())
+        return session.execute(statement, params).rowcount
 
     def expunge(self) -> None:
         """脱离会话"""
@@ -62,6 +118,31 @@ class CRUDModel(DeclarativeModel):
 
     __abstract__ = True
 
+    @classmethod
+    def _filter_query(cls, expressions: tuple, kwargs: dict, _columns: Columns = None, _order_by=None,
+                      _eager: Relationships = None) -> Query:
+        """构建带查询字段、条件和排序的查询，没有条件时不生成额外的查询副本"""
+        query = cls.query(*_as_tuple(_columns), _eager=_eager)
+        if expressions:
+            query = query.filter(*expressions)
+        if kwargs:
+            query = query.filter_by(**kwargs)
+        return query if _order_by is None else query.order_by(*_as_tuple(_order_by))
+
+    @classmethod
+    def _select_one(cls, expressions: tuple, kwargs: dict, _columns: Columns = None, _order_by=None) -> Any:
+        """查询一条记录，直接执行select语句，模型对象不经过Row包装"""
+        statement = select(*(_as_tuple(_columns) or cls._default_entities))
+        if expressions:
+            statement = statement.where(*expressions)
+        if kwargs:
+            statement = statement.filter_by(**kwargs)
+        if _order_by is not None:
+            statement = statement.order_by(*_as_tuple(_order_by))
+        result = cls.session().execute(statement.limit(1))
+        """连接预加载的集合会产生重复行，模型对象需要先去重"""
+        return result.unique().scalar_one_or_none() if _columns is None else result.one_or_none()
+
     """新增"""
 
     def insert(self, flush: bool = True) -> None:
@@ -74,37 +155,74 @@ class CRUDModel(DeclarativeModel):
         user.insert()
         ```
         """
-        self.expunge()
-        self.session().add(self)
+        """新建的对象本身就是瞬时状态，无需再清理状态"""
+        if not sa_inspect(self).transient:
+            self.expunge()
+        session = self.session()
+        session.add(self)
         if flush:
-            self.session().flush()
+            session.flush()
 
     @classmethod
     def insert_by_obj(cls: Type[_T], object) -> _T:
         """插入任意对象"""
-        return cls(**dict(object)).insert()
+        target = cls(**dict(object))
+        target.insert()
+        return target
 
     @classmethod
-    def insert_batch(cls, objects: List[Any]) -> List[_T]:
-        """插入分批对象"""
-        results: List[_T] = []
-        for obj in objects:
-            _empty_primary(cls, object)
-            if isinstance(obj, cls):
-                target = obj
-            else:
-                target = cls(**dict(obj))
-            target.insert(flush=False)
-            results.append(target)
-        cls.session().flush()
-        return results
+    def insert_batch(cls: Type[_T], objects: List[Any], _returning: bool = True) -> Union[List[_T], int]:
+        """
+        插入分批对象，主键由数据库生成
+
+        传入模型对象时逐个添加后统一刷新，传入的对象即返回的对象，关系属性一并插入；
+        只传入字典时，数据库支持批量RETURNING则使用一条批量INSERT语句插入，不经过逐行的工作单元，返回插入后的新对象。
+        模型存在before_insert监听（如操作人混合）或数据库不支持批量RETURNING时同样逐个添加后统一刷新。
+        只传入字典且不需要返回对象时，PostgreSQL(psycopg2)达到COPY_THRESHOLD行使用COPY写入
+
+        Args:
+            objects: 模型对象或可转换为字典的对象列表
+            _returning: 是否返回插入后的对象
+
+        Returns:
+            插入后的对象列表，顺序与传入的对象一致；_returning为False时返回插入的行数
+        """
+        if not objects:
+            return [] if _returning else 0
+        session = cls.session()
+        bind = session.get_bind()
+        mapper = sa_inspect(cls)
+        if (mapper.dispatch.before_insert or (_returning and not bind.dialect.insert_executemany_returning)
+                or any(isinstance(obj, cls) for obj in objects)):
+            results: List[_T] = []
+            for obj in objects:
+                if isinstance(obj, cls):
+                    target = obj
+                else:
+                    values = dict(obj)
+                    _check_insert_keys(cls, mapper.attrs, values)
+                    target = cls(**values)
+                _empty_primary(cls, target)
+                if not sa_inspect(target).transient:
+                    make_transient(target)
+                session.add(target)
+                results.append(target)
+            session.flush()
+            return results if _returning else len(results)
+        rows = _build_insert_rows(cls, objects)
+        if _returning:
+            statement = insert(cls).returning(cls, sort_by_parameter_order=True)
+            return list(session.scalars(statement, rows).all())
+        if not (len(rows) >= COPY_THRESHOLD and _supports_copy(bind) and _copy_rows(session, cls, rows)):
+            session.execute(insert(cls), rows)
+        return len(rows)
 
     """更新"""
 
     @classmethod
     def update_by_id(cls, id: ID, values: dict) -> int:
         """
-        根据ID条件更新
+        根据ID条件更新，不同步会话中已加载的对象，需要最新数据时请刷新对象
 
         Args:
             id: 主键ID
@@ -118,12 +236,12 @@ class CRUDModel(DeclarativeModel):
                 User.nickname: '张三'
             })
         """
-        return cls.query().filter(cls.primary_column() == id).update(values)
+        return cls._execute_update(cls._pk_statement('update').values(values), {'_id': id})
 
     @classmethod
     def update_batch_ids(cls, ids: List[ID], values: dict) -> int:
         """
-        根据ID列表条件更新
+        根据ID列表条件更新，不同步会话中已加载的对象，需要最新数据时请刷新对象
 
         Args:
             ids: 主键ID列表
@@ -137,7 +255,7 @@ class CRUDModel(DeclarativeModel):
                 User.nickname: '张三'
             })
         """
-        return cls.query().filter(cls.primary_column().in_(ids)).update(values)
+        return cls._execute_update(cls._pk_statement('update_batch').values(values), {'_ids': ids})
 
     @classmethod
     def update(cls, *expressions, values: dict, **kwargs) -> int:
@@ -163,9 +281,10 @@ class CRUDModel(DeclarativeModel):
 
     def save(self, flush: bool = True) -> None:
         """保存对象"""
-        self.session().merge(self)
+        session = self.session()
+        session.merge(self)
         if flush:
-            self.session().flush()
+            session.flush()
 
     """读取"""
 
@@ -184,7 +303,10 @@ class CRUDModel(DeclarativeModel):
         Example:
             User.get_by_id(1, User.id, User.nickname)
         """
-        return cls.query(*columns).filter(cls.primary_column() == id).first()
+        if columns:
+            return cls._select_one((cls.primary_column() == id,), {}, columns)
+        """连接预加载的集合会产生重复行，需要先去重"""
+        return cls.session().execute(cls._pk_statement('get'), {'_id': id}).unique().scalar_one_or_none()
 
     @classmethod
     def select_one(cls: Type[_T], *expressions, _columns: Columns = None, _order_by=None, **kwargs) -> _T:
@@ -203,7 +325,7 @@ class CRUDModel(DeclarativeModel):
         Example:
             User.select_one(User.id == 1, id=1, _columns=User.id, _order_by=User.id.desc())
         """
-        return cls.get(*expressions, _columns=_columns, _order_by=_order_by, **kwargs)
+        return cls._select_one(expressions, kwargs, _columns, _order_by)
 
     @classmethod
     def get_one(cls: Type[_T], *expressions, _columns: Columns = None, _order_by=None, **kwargs) -> _T:
@@ -221,7 +343,7 @@ class CRUDModel(DeclarativeModel):
         Example:
             User.select_one(User.id == 1, id=1, _columns=User.id, _order_by=User.id.desc())
         """
-        return cls.get(*expressions, _columns=_columns, _order_by=_order_by, **kwargs)
+        return cls._select_one(expressions, kwargs, _columns, _order_by)
 
     @classmethod
     def get(cls: Type[_T], *expressions, _columns: Columns = None, _order_by=None, **kwargs) -> _T:
@@ -239,10 +361,7 @@ class CRUDModel(DeclarativeModel):
         Example:
             User.select_one(User.id == 1, id=1, _columns=User.id, _order_by=User.id.desc())
         """
-        query = cls.query(*_build_columns_query(cls, _columns)).filter(*expressions).filter_by(**kwargs)
-        if _order_by is not None:
-            query = _build_order_by_query(query, _order_by)
-        return query.first()
+        return cls._select_one(expressions, kwargs, _columns, _order_by)
 
     @classmethod
     def get_by_dict(cls: Type[_T], values: Dict[str, Any]) -> _T:
@@ -255,7 +374,7 @@ class CRUDModel(DeclarativeModel):
         Returns:
             T 模型对象 | Row 行数据 | None
         """
-        return cls.query().filter_by(**values).first()
+        return cls._select_one((), values)
 
     """列表式"""
 
@@ -267,6 +386,7 @@ class CRUDModel(DeclarativeModel):
         _limit: Optional[int] = None,
         _offset: Optional[int] = None,
         _order_by=None,
+        _eager: Relationships = None,
         **kwargs
     ) -> List[_T]:
         """
@@ -278,6 +398,7 @@ class CRUDModel(DeclarativeModel):
             _limit: 限制数量，设置该字段将最多返回设置的数量
             _offset: 偏移量，设置该字段将跳过对应数量
             _order_by: 排序字段，支持元祖类型传递
+            _eager: 预加载的关系，使用selectinload避免N+1查询，支持元祖类型传递
             kwargs: where条件以字典形式传递
 
         Returns:
@@ -286,9 +407,7 @@ class CRUDModel(DeclarativeModel):
         Example:
             User.select(User.id == 1, id=1, _columns=User.id, _order_by=User.id.desc(), _limit=1, _offset=1)
         """
-        query = cls.query(*_build_columns_query(cls, _columns)).filter(*expressions).filter_by(**kwargs)
-        if _order_by is not None:
-            query = _build_order_by_query(query, _order_by)
+        query = cls._filter_query(expressions, kwargs, _columns, _order_by, _eager)
         if _limit is not None:
             query = query.limit(_limit)
         if _offset is not None:
@@ -302,6 +421,7 @@ class CRUDModel(DeclarativeModel):
         *expressions,
         _columns: Columns = None,
         _order_by=None,
+        _eager: Relationships = None,
         **kwargs
     ) -> List[_T]:
         """
@@ -312,6 +432,7 @@ class CRUDModel(DeclarativeModel):
             expressions: where表达式以元祖的形式传递
             _columns: 查询字段列表一旦添加返回类型为Row且不可变
             _order_by: 排序字段，支持元祖类型传递
+            _eager: 预加载的关系，使用selectinload避免N+1查询，支持元祖类型传递
             kwargs: where条件以字典形式传递
 
         Returns:
@@ -320,9 +441,7 @@ class CRUDModel(DeclarativeModel):
         Example:
             User.select_page(Page(1, 20), User.id == 1, id=1, _columns=User.id, _order_by=User.id.desc())
         """
-        query = cls.query(*_build_columns_query(cls, _columns)).filter(*expressions).filter_by(**kwargs)
-        if _order_by is not None:
-            query = _build_order_by_query(query, _order_by)
+        query = cls._filter_query(expressions, kwargs, _columns, _order_by, _eager)
         query = _build_pagination_query(query, page)
         return query.all()
 
@@ -333,16 +452,21 @@ class CRUDModel(DeclarativeModel):
         *expressions,
         _columns: Columns = None,
         _order_by=None,
+        _eager: Relationships = None,
         **kwargs
     ) -> Tuple[int, List[_T]]:
         """
         根据复杂条件查询所有记录并查询总记录数量和分页
 
+        数据库支持窗口函数时通过COUNT(*) OVER()在分页查询中一并返回总数，只有一次往返；
+        页码超出范围没有返回行时再单独查询总数
+
         Args:
             page: IPage子类你可以集成IPage并实现它所需的方法，FastAPIDB就能识别你的分页载荷。
             expressions: where表达式以元祖的形式传递
-            _columns: 查询字段列表一旦添加返回类型为Row且不可变
+            _columns: 查询字段列表一旦添加返回类型为Row且不可变，使用窗口函数时Row末尾多一列_total
             _order_by: 排序字段，支持元祖类型传递
+            _eager: 预加载的关系，使用selectinload避免N+1查询，支持元祖类型传递
             kwargs: where条件以字典形式传递
 
         Returns:
@@ -356,22 +480,94 @@ class CRUDModel(DeclarativeModel):
                                 _order_by=User.id.desc()
                             )
         """
-        query = cls.query(*_build_columns_query(cls, _columns)).filter(*expressions).filter_by(**kwargs)
-        if _order_by is not None:
-            query = _build_order_by_query(query, _order_by)
-        count = query.count()
-        query = _build_pagination_query(query, page)
-        return count, query.all()
+        query = cls._filter_query(expressions, kwargs, _columns, _order_by, _eager)
+        if not _supports_window_functions(cls.session().get_bind().dialect):
+            count = query.count()
+            return count, _build_pagination_query(query, page).all()
+
+        rows = _build_pagination_query(query.add_columns(func.count().over().label('_total')), page).all()
+        if not rows:
+            return (query.count() if page.get_page() > 1 else 0), []
+        count = rows[0][-1]
+        return count, (rows if _columns is not None else [row[0] for row in rows])
 
     @classmethod
-    def select_all(cls: Type[_T]) -> List[_T]:
+    def select_all(cls: Type[_T], _eager: Relationships = None) -> List[_T]:
         """不加任何条件查询所有"""
-        return cls.query().all()
+        return cls.query(_eager=_eager).all()
+
+    @classmethod
+    def iter_all(
+        cls: Type[_T],
+        *expressions,
+        _columns: Columns = None,
+        _order_by=None,
+        _eager: Relationships = None,
+        _chunk_size: int = 1000,
+        **kwargs
+    ) -> Iterator[_T]:
+        """
+        根据复杂条件流式查询所有记录，使用服务端游标分批加载，内存占用只与_chunk_size有关
+
+        需要在当前事务内迭代完成，事务结束后游标随会话关闭
+
+        Args:
+            expressions: where表达式以元祖的形式传递
+            _columns: 查询字段列表一旦添加返回类型为Row且不可变
+            _order_by: 排序字段，支持元祖类型传递
+            _eager: 预加载的关系，使用selectinload按批加载，支持元祖类型传递
+            _chunk_size: 每批加载的行数
+            kwargs: where条件以字典形式传递
+
+        Returns:
+            Iterator[T] 迭代器[模型对象] | Iterator[Row] 迭代器[行数据]
+
+        Example:
+            for user in User.iter_all(User.id > 100, _chunk_size=500):
+                ...
+        """
+        query = cls._filter_query(expressions, kwargs, _columns, _order_by, _eager)
+        yield from query.execution_options(stream_results=True).yield_per(_chunk_size)
 
     @classmethod
-    def select_batch_ids(cls: Type[_T], ids: List[ID]) -> List[_T]:
-        """查询（根据ID 批量查询）"""
-        return cls.query().filter(cls.primary_column().in_(ids)).all()
+    def select_batch_ids(
+        cls: Type[_T],
+        ids: List[ID],
+        _eager: Relationships = None,
+        _from_session: bool = False
+    ) -> List[_T]:
+        """
+        查询（根据ID 批量查询）
+
+        Args:
+            ids: 主键ID列表
+            _eager: 预加载的关系，使用selectinload避免N+1查询，支持元祖类型传递
+            _from_session: 先从会话的标识映射中获取已加载的对象，只查询缺失的ID，结果按ids的顺序返回
+
+        Returns:
+            List[T] 列表[模型对象] | []
+        """
+        if not _from_session:
+            if _eager is not None:
+                return cls.query(_eager=_eager).filter(cls.primary_column().in_(ids)).all()
+            return list(cls.session().execute(cls._pk_statement('select_batch'), {'_ids': ids}).unique().scalars())
+
+        """结果按标识键对应，传入的ID先按主键列类型转换，如字符串'1'与整数主键1对应同一对象"""
+        mapper = sa_inspect(cls)
+        identity_map = cls.session().identity_map
+        keys = [mapper.identity_key_from_primary_key((id,)) for id in _coerce_ids(cls, ids)]
+        found: Dict[Any, _T] = {}
+        missing: List[Any] = []
+        for key in dict.fromkeys(keys):
+            obj = identity_map.get(key)
+            if obj is None:
+                missing.append(key[1][0])
+            else:
+                found[key] = obj
+        if missing:
+            for obj in cls.query(_eager=_eager).filter(cls.primary_column().in_(missing)).all():
+                found[mapper.identity_key_from_instance(obj)] = obj
+        return [found[key] for key in keys if key in found]
 
     @classmethod
     def select_count(cls: Type[_T], *expressions, **kwargs) -> int:
@@ -382,9 +578,10 @@ class CRUDModel(DeclarativeModel):
 
     def delete(self, flush: bool = True) -> None:
         """删除自身"""
-        self.session().delete(self)
+        session = self.session()
+        session.delete(self)
         if flush:
-            self.session().flush()
+            session.flush()
 
     @classmethod
     def delete_by_expressions(cls, *expressions, **kwargs) -> int:
@@ -394,7 +591,7 @@ class CRUDModel(DeclarativeModel):
     @classmethod
     def delete_by_id(cls, rid: ID) -> int:
         """根据 ID 删除"""
-        return cls.query().filter(cls.primary_column() == rid).delete()
+        return cls.session().execute(cls._pk_statement('delete'), {'_id': rid}).rowcount
 
     @classmethod
     def delete_by_dict(cls, values: Dict[str, Any]) -> int:
@@ -410,15 +607,20 @@ class CRUDModel(DeclarativeModel):
 
     @classmethod
     def exist(cls, *expressions, **kwargs) -> bool:
-        return cls.query().filter(*expressions).filter_by(**kwargs).count() > 0
+        """根据条件判断记录是否存在，使用EXISTS在找到第一条记录时即停止"""
+        return cls.session().query(cls.query().filter(*expressions).filter_by(**kwargs).exists()).scalar()
 
     @classmethod
     def exist_by_id(cls, id: ID) -> bool:
-        return cls.query().filter(cls.primary_column() == id).count() > 0
+        """根据ID判断记录是否存在，只查询主键"""
+        primary_column = cls.primary_column()
+        return cls.query(primary_column).filter(primary_column == id).limit(1).scalar() is not None
 
     @classmethod
     def exit_by_id(cls, id: ID) -> bool:
-        return cls.query().filter(cls.primary_column() == id).count() > 0
+        """已弃用，请使用exist_by_id"""
+        warnings.warn('`exit_by_id` 已弃用，请使用 `exist_by_id`', DeprecationWarning, stacklevel=2)
+        return cls.exist_by_id(id)
 
 
 class Model(CRUDModel):
@@ -491,6 +693,14 @@ class OperateMixin(AbstractOperateMixin):
         return cls.modified_user_id
 
 
+@event.listens_for(DeclarativeModel, 'instrument_class', propagate=True)
+def _cache_columns(_, cls: Type[DeclarativeModel]) -> None:
+    """模型映射时缓存字段列表并重置主键属性，CRUD方法不再每次遍历列"""
+    cls._columns_list = list(cls.__table__.columns.values())
+    cls._pk = None
+    cls._statements = {}
+
+
 @event.listens_for(AbstractOperateMixin, 'before_insert', propagate=True)
 def before_operate_insert(_, __, target: AbstractOperateMixin) -> None:
     """监听插入"""
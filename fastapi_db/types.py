@@ -4,6 +4,8 @@ from abc import ABC, abstractmethod
 class IPage(ABC):
     """分页"""
 
+    __slots__ = ()
+
     def __init__(self, page: int, page_size: int):
         self.set_page(page)
         self.set_page_size(page_size)
@@ -28,20 +30,69 @@ class IPage(ABC):
 
 
 class Page(IPage):
-    """分页封装"""
+    """分页封装，创建和修改时预先计算偏移量和数量"""
+
+    __slots__ = ('_page', '_page_size', '_page_size_max', '_offset', '_limit')
+
+    """每页数量上限，不作为构造参数，避免作为FastAPI依赖时被客户端通过查询参数修改"""
+    default_page_size_max: int = 100
+
+    def __init__(self, page: int = 1, page_size: int = 20):
+        self._page = page
+        self._page_size = page_size
+        self._page_size_max = self.default_page_size_max
+        self._compute()
+
+    def _compute(self) -> None:
+        self._limit = min(self._page_size, self._page_size_max)
+        self._offset = (self._page - 1) * self._limit
+
+    @property
+    def page(self) -> int:
+        return self._page
+
+    @page.setter
+    def page(self, page: int) -> None:
+        self._page = page
+        self._compute()
+
+    @property
+    def page_size(self) -> int:
+        return self._page_size
+
+    @page_size.setter
+    def page_size(self, page_size: int) -> None:
+        self._page_size = page_size
+        self._compute()
+
+    @property
+    def page_size_max(self) -> int:
+        return self._page_size_max
+
+    @page_size_max.setter
+    def page_size_max(self, page_size_max: int) -> None:
+        self._page_size_max = page_size_max
+        self._compute()
+
+    @property
+    def offset(self) -> int:
+        return self._offset
+
+    @property
+    def limit(self) -> int:
+        return self._limit
 
-    page: int = 1
-    page_size: int = 20
-    page_size_max: int = 100
+    def __repr__(self) -> str:
+        return f'Page(page={self._page}, page_size={self._page_size}, page_size_max={self._page_size_max})'
 
     def get_page(self) -> int:
-        return self.page
+        return self._page
 
     def get_page_size(self) -> int:
-        return self.page_size
+        return self._page_size
 
     def get_page_size_max(self) -> int:
-        return self.page_size_max
+        return self._page_size_max
 
     def set_page(self, page: int) -> None:
         self.page = page
@@ -1,33 +1,232 @@
+import inspect
+import io
+import warnings
+from collections.abc import MutableMapping
 from enum import Enum
-from typing import Any, Union, Type
+from functools import lru_cache, update_wrapper
+from typing import Any, Union, Type, Tuple, Callable, List, Iterable
 
-from sqlalchemy.orm import Query
+from sqlalchemy import Boolean, Column, Date, DateTime, Enum as SAEnum, Float, Integer, Numeric, String, Time, \
+    inspect as sa_inspect
+from sqlalchemy.orm import Query, selectinload, joinedload
 
 from .constants import _T
-from .types import IPage
+from .types import IPage, Page
 
 
-def _empty_primary(cls, object: Any) -> bool:
-    from .models import DeclarativeModel
-    cls: DeclarativeModel
+def _empty_primary(cls, obj: Any) -> None:
+    """清空主键由数据库生成，字典写入键，模型对象直接写入实例字典"""
+    key = cls.primary_column().key
+    if isinstance(obj, MutableMapping):
+        obj[key] = None
+    else:
+        obj.__dict__[key] = None
 
+
+def _check_insert_keys(cls, attrs, row: dict) -> None:
+    """插入的字段必须是模型的映射属性，批量INSERT和逐个添加时同样拒绝未知字段"""
+    for key in row:
+        if key not in attrs:
+            raise TypeError(f'`{key}` 不是 {cls.__name__} 的映射属性')
+
+
+def _build_insert_rows(cls, objects: Iterable[Any]) -> List[dict]:
+    """将可转换为字典的对象转换为批量插入的行，去掉主键由数据库生成"""
+    primary_key = cls.primary_column().key
+    attrs = sa_inspect(cls).attrs
+    rows = []
+    for obj in objects:
+        row = dict(obj)
+        _check_insert_keys(cls, attrs, row)
+        row.pop(primary_key, None)
+        rows.append(row)
+    return rows
+
+
+def _as_tuple(value: Any) -> tuple:
+    """将查询字段或排序参数统一为元组，None为空元组，元组原样返回"""
+    if value is None:
+        return ()
+    return value if type(value) is tuple else (value,)
+
+
+def _coerce_ids(cls, ids: Iterable[Any]) -> List[Any]:
+    """按主键列的Python类型转换ID，无法确定类型或转换失败时保留原值"""
     try:
-        if hasattr(object, cls.primary_column().key):
-            setattr(object, cls.primary_column().key, None)
-        elif cls.primary_column().key in object:
-            object[cls.primary_column().key] = None
-        return True
-    except (KeyError, AttributeError):
+        python_type = cls.primary_column().type.python_type
+    except NotImplementedError:
+        return list(ids)
+    result = []
+    for id in ids:
+        if not isinstance(id, python_type):
+            try:
+                id = python_type(id)
+            except (TypeError, ValueError):
+                pass
+        result.append(id)
+    return result
+
+
+def _supports_copy(bind) -> bool:
+    """COPY写入目前仅支持PostgreSQL的psycopg2驱动"""
+    return bind.dialect.name == 'postgresql' and bind.dialect.driver == 'psycopg2'
+
+
+"""COPY按文本写入的列类型，这些类型的值直接转为字符串即可，其余类型需要经过绑定处理"""
+_COPY_TYPES = (String, Integer, Numeric, Float, Boolean, Date, DateTime, Time)
+
+
+def _csv_field(value: Any) -> str:
+    """CSV格式下未加引号的空字段为NULL，其余值一律加引号以区分空字符串"""
+    if value is None:
+        return ''
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy_rows(session, cls, rows: List[dict]) -> bool:
+    """
+    使用COPY FROM STDIN写入行，绕过逐条语句的解析和计划
+
+    COPY不会执行Python端的列默认值，缺少的列按标量默认值补齐；各行字段不一致、包含非列字段、
+    列类型需要绑定处理（枚举、JSON、二进制、自定义类型等）或缺少的列使用非标量默认值时返回False，由调用方回退到INSERT；
+    继承映射的模型写入多张表或需要写入多态标识，包含column_property等非本表列的映射同样回退
+    """
+    mapper = sa_inspect(cls)
+    if mapper.inherits is not None or mapper.polymorphic_on is not None:
+        return False
+    keys = list(rows[0])
+    if any(key not in mapper.column_attrs for key in keys) or any(row.keys() != rows[0].keys() for row in rows):
         return False
 
+    defaults = []
+    for attribute in mapper.column_attrs:
+        column = attribute.columns[0]
+        if not isinstance(column, Column) or column.table is not cls.__table__:
+            return False
+        if attribute.key not in rows[0]:
+            if column.default is None:
+                continue
+            if not column.default.is_scalar:
+                return False
+            defaults.append(column.default.arg)
+            keys.append(attribute.key)
+        if not isinstance(column.type, _COPY_TYPES) or isinstance(column.type, SAEnum):
+            return False
+
+    buffer = io.StringIO()
+    count = len(rows[0])
+    for row in rows:
+        """按首行的字段顺序取值，各行字典的插入顺序可能不同"""
+        buffer.write(','.join(map(_csv_field, (*(row[key] for key in keys[:count]), *defaults))))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    preparer = session.get_bind().dialect.identifier_preparer
+    columns = ', '.join(preparer.format_column(mapper.column_attrs[key].columns[0]) for key in keys)
+    statement = f'COPY {preparer.format_table(cls.__table__)} ({columns}) FROM STDIN WITH (FORMAT csv)'
+    with session.connection().connection.cursor() as cursor:
+        cursor.copy_expert(statement, buffer)
+    return True
+
+
+@lru_cache(maxsize=None)
+def _value_map(target: Type[Enum]) -> dict:
+    """枚举值到枚举成员的映射，每个枚举类只构建一次"""
+    return {member.value: member for member in target}
+
 
 def _deserialize_enum(target: Type[_T], value: Union[Enum, str]):
     if isinstance(value, str):
-        return target(value)
+        member = _value_map(target).get(value)
+        """未命中时交给枚举构造抛出原有的异常"""
+        return target(value) if member is None else member
     return value
 
 
+_Shape = Tuple[Tuple[str, inspect._ParameterKind, bool], ...]
+
+"""无法按原函数签名生成时使用的通用签名"""
+_GENERIC_SHAPE: _Shape = (
+    ('args', inspect.Parameter.VAR_POSITIONAL, False),
+    ('kwargs', inspect.Parameter.VAR_KEYWORD, False),
+)
+
+
+@lru_cache(maxsize=None)
+def _wrapper_factory(shape: _Shape, is_async: bool) -> Callable:
+    """按签名生成事务装饰器包装函数的工厂，相同签名只生成一次"""
+    params, call_args, defaults = [], [], []
+    star = False
+    for index, (name, kind, has_default) in enumerate(shape):
+        if kind == inspect.Parameter.KEYWORD_ONLY and not star:
+            params.append('*')
+            star = True
+
+        if kind == inspect.Parameter.VAR_POSITIONAL:
+            params.append(f'*{name}')
+            call_args.append(f'*{name}')
+            star = True
+        elif kind == inspect.Parameter.VAR_KEYWORD:
+            params.append(f'**{name}')
+            call_args.append(f'**{name}')
+        else:
+            if has_default:
+                defaults.append(f'_d{index}')
+                params.append(f'{name}=_d{index}')
+            else:
+                params.append(name)
+            call_args.append(f'{name}={name}' if kind == inspect.Parameter.KEYWORD_ONLY else name)
+
+        if kind == inspect.Parameter.POSITIONAL_ONLY and (
+                index + 1 == len(shape) or shape[index + 1][1] != inspect.Parameter.POSITIONAL_ONLY):
+            params.append('/')
+
+    call = f'_func({", ".join(call_args)})'
+    if is_async:
+        body = (f'        _manager = await _enter()\n'
+                f'        if _manager is None:\n'
+                f'            return await {call}\n'
+                f'        async with _manager:\n'
+                f'            return await {call}\n')
+    else:
+        body = (f'        _manager = _enter()\n'
+                f'        if _manager is None:\n'
+                f'            return {call}\n'
+                f'        with _manager:\n'
+                f'            return {call}\n')
+    source = (f'def _factory(_func, _enter, {", ".join(defaults)}):\n'
+              f'    {"async " if is_async else ""}def wrapper({", ".join(params)}):\n'
+              f'{body}'
+              f'    return wrapper\n')
+    namespace = {}
+    exec(source, namespace)
+    return namespace['_factory']
+
+
+def _make_wrapper(func: Callable, enter: Callable, is_async: bool = False) -> Callable:
+    """
+    生成与原函数签名一致的包装函数，调用时不再打包*args和**kwargs
+    enter返回事务管理器，异步时为返回事务管理器的协程函数，返回None时直接调用原函数
+    """
+    try:
+        parameters = list(inspect.signature(func, follow_wrapped=False).parameters.values())
+    except (TypeError, ValueError):
+        parameters = None
+
+    shape, defaults = _GENERIC_SHAPE, []
+    if parameters is not None:
+        reserved = {'_func', '_enter', '_manager'} | {f'_d{index}' for index in range(len(parameters))}
+        if not any(parameter.name in reserved for parameter in parameters):
+            shape = tuple((p.name, p.kind, p.default is not p.empty) for p in parameters)
+            defaults = [p.default for p in parameters if p.default is not p.empty]
+
+    wrapper = _wrapper_factory(shape, is_async)(func, enter, *defaults)
+    return update_wrapper(wrapper, func)
+
+
 def _build_columns_query(cls, columns) -> tuple:
+    """已弃用，模型查询使用CRUDModel._filter_query"""
+    warnings.warn('`_build_columns_query` 已弃用', DeprecationWarning, stacklevel=2)
     if columns is None:
         return (cls,)
     elif isinstance(columns, tuple):
@@ -36,9 +235,32 @@ def _build_columns_query(cls, columns) -> tuple:
 
 
 def _build_order_by_query(query: Query, order_by) -> Query:
+    """已弃用，模型查询使用CRUDModel._filter_query"""
+    warnings.warn('`_build_order_by_query` 已弃用', DeprecationWarning, stacklevel=2)
     return query.order_by(*order_by) if isinstance(order_by, tuple) else query.order_by(order_by)
 
 
+def _build_eager_query(query: Query, eager, joined) -> Query:
+    if eager is not None:
+        query = query.options(*[selectinload(attr) for attr in (eager if isinstance(eager, tuple) else (eager,))])
+    if joined is not None:
+        query = query.options(*[joinedload(attr) for attr in (joined if isinstance(joined, tuple) else (joined,))])
+    return query
+
+
+def _supports_window_functions(dialect) -> bool:
+    """MySQL 8.0、MariaDB 10.2、SQLite 3.25之前不支持窗口函数"""
+    if dialect.name == 'sqlite':
+        return dialect.dbapi is None or dialect.dbapi.sqlite_version_info >= (3, 25)
+    if dialect.name in ('mysql', 'mariadb'):
+        version = dialect.server_version_info or ()
+        return version >= ((10, 2) if getattr(dialect, 'is_mariadb', False) else (8,))
+    return True
+
+
 def _build_pagination_query(query: Query, page: IPage) -> Query:
+    """Page已预先计算偏移量和数量，子类可能重写取值方法，和自定义的IPage实现一样按接口计算"""
+    if type(page) is Page:
+        return query.offset(page._offset).limit(page._limit)
     page_size = min(page.get_page_size(), page.get_page_size_max())
     return query.offset((page.get_page() - 1) * page_size).limit(page_size)
\ No newline at end of file
@@ -17,7 +17,7 @@ setup(
     license='MIT',
     packages=find_packages(),
     install_requires=[
-        'sqlalchemy>=1.4.46',
+        'sqlalchemy>=2.0.10',
         'fastapi'
     ],
     classifiers=[
@@ -0,0 +1,39 @@
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+
+from fastapi_db import FastAPIDB
+from .models import Base
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "test.db"}')
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def app():
+    return FastAPI()
+
+
+@pytest.fixture
+def make_db():
+    """创建扩展，测试结束时释放"""
+    extensions = []
+
+    def make(*args, **kwargs) -> FastAPIDB:
+        extension = FastAPIDB(*args, **kwargs)
+        extensions.append(extension)
+        return extension
+
+    yield make
+    for extension in reversed(extensions):
+        extension.dispose()
+
+
+@pytest.fixture
+def db(make_db, app, engine):
+    return make_db(app, engine=engine)
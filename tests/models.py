@@ -0,0 +1,47 @@
+from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy.orm import relationship
+
+from fastapi_db import Model
+
+
+class Base(Model):
+    __abstract__ = True
+
+
+class User(Base):
+    __tablename__ = 'user'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    username = Column(String(32), nullable=False, unique=True)
+
+
+class Account(Base):
+    """属性名与列名不同的主键"""
+    __tablename__ = 'account'
+    id = Column('account_id', Integer, primary_key=True, autoincrement=True)
+    name = Column(String(32))
+
+
+class Parent(Base):
+    __tablename__ = 'parent'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    children = relationship('Child', back_populates='parent')
+
+
+class Child(Base):
+    __tablename__ = 'child'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    parent_id = Column(Integer, ForeignKey('parent.id'))
+    parent = relationship('Parent', back_populates='children')
+
+
+class Author(Base):
+    """连接预加载集合，查询结果需要去重"""
+    __tablename__ = 'author'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    books = relationship('Book', lazy='joined')
+
+
+class Book(Base):
+    __tablename__ = 'book'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    author_id = Column(Integer, ForeignKey('author.id'))
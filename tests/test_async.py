@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from fastapi_db import AsyncFastAPIDB, Propagation, atransactional, ctx, local_transaction
+from .models import Base, User
+
+
+@pytest.fixture
+def async_db(tmp_path):
+    engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path / "test.db"}')
+
+    async def create_all():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create_all())
+    extension = AsyncFastAPIDB(engine=engine)
+    yield extension
+    asyncio.run(extension.dispose())
+
+
+async def _count() -> int:
+    async with local_transaction():
+        return await ctx.session.scalar(select(func.count()).select_from(User))
+
+
+def test_async_local_transaction_commits(async_db):
+    async def run():
+        async with local_transaction():
+            ctx.session.add(User(username='a'))
+        return await _count()
+
+    assert asyncio.run(run()) == 1
+
+
+def test_async_local_transaction_rolls_back_on_error(async_db):
+    async def run():
+        with pytest.raises(ValueError):
+            async with local_transaction():
+                ctx.session.add(User(username='a'))
+                await ctx.session.flush()
+                raise ValueError
+        return await _count()
+
+    assert asyncio.run(run()) == 0
+
+
+def test_atransactional_propagation(async_db):
+    sessions = {}
+
+    @atransactional(propagation=Propagation.NEW)
+    async def new():
+        sessions['new'] = ctx.session
+
+    @atransactional()
+    async def joined():
+        sessions['joined'] = ctx.session
+        await new()
+        assert ctx.session is sessions['joined']
+
+    @atransactional()
+    async def outer():
+        sessions['outer'] = ctx.session
+        await joined()
+        ctx.session.add(User(username='a'))
+
+    asyncio.run(outer())
+    assert sessions['joined'] is sessions['outer']
+    assert sessions['new'] is not sessions['outer']
+    assert asyncio.run(_count()) == 1
+
+
+def test_sync_local_transaction_rejected_for_async_extension(async_db):
+    with pytest.raises(RuntimeError):
+        with local_transaction():
+            pass
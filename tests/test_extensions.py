@@ -0,0 +1,143 @@
+import gc
+import logging
+import os
+import subprocess
+import sys
+import weakref
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from fastapi_db import FastAPIDB, ctx, get_transaction_context, local_transaction
+from fastapi_db.exceptions import SessionInitError
+from fastapi_db.extensions import _count_query
+from .models import User
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_pool_defaults_for_datasource_url(make_db, tmp_path):
+    extension = make_db(datasource_url=f'sqlite:///{tmp_path / "pool.db"}')
+    pool = extension.engine.pool
+    assert isinstance(pool, QueuePool)
+    assert pool.size() == 20
+    assert pool.timeout() == 30
+    assert pool._pre_ping
+    assert pool._pool.use_lifo
+
+
+def test_pool_use_lifo_can_be_disabled(make_db, tmp_path):
+    extension = make_db(datasource_url=f'sqlite:///{tmp_path / "pool.db"}', pool_use_lifo=False)
+    assert not extension.engine.pool._pool.use_lifo
+
+
+def test_engine_kwargs_override_pool_defaults(make_db, tmp_path):
+    extension = make_db(datasource_url=f'sqlite:///{tmp_path / "pool.db"}', pool_size=5, engine_kwargs={'pool_size': 3})
+    assert extension.engine.pool.size() == 3
+
+
+def test_batch_execution_defaults(make_db, tmp_path):
+    extension = make_db(datasource_url=f'sqlite:///{tmp_path / "batch.db"}', insertmanyvalues_page_size=50)
+    assert extension.engine.dialect.insertmanyvalues_page_size == 50
+    assert 'executemany_mode' not in extension.build_engine_kwargs()
+
+def test_pool_defaults_skip_non_queue_pools(make_db):
+    extension = make_db(datasource_url='sqlite://', engine_kwargs={'poolclass': StaticPool})
+    assert isinstance(extension.engine.pool, StaticPool)
+
+
+def test_uninitialized_extension_raises():
+    code = ('from fastapi_db import get_transaction_context\n'
+            'from fastapi_db.exceptions import SessionInitError\n'
+            'try:\n'
+            '    get_transaction_context()\n'
+            'except SessionInitError:\n'
+            '    print("raised")\n')
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=ROOT, check=True)
+    assert result.stdout.strip() == 'raised'
+
+
+@pytest.mark.parametrize('value, configured', [('1', True), ('', False)])
+def test_configure_mappers_from_environment(make_db, engine, monkeypatch, value, configured):
+    calls = []
+    monkeypatch.setenv('FASTAPI_DB_CONFIGURE_MAPPERS', value)
+    monkeypatch.setattr('fastapi_db.extensions.configure_mappers', lambda: calls.append(True))
+    make_db(engine=engine)
+    assert bool(calls) is configured
+
+def test_query_count_threshold_warns_once(make_db, engine, caplog):
+    make_db(engine=engine, debug_query_count_threshold=1)
+    with caplog.at_level(logging.WARNING, logger='fastapi_db.extensions'):
+        with local_transaction() as context:
+            for _ in range(3):
+                User.select_count()
+            assert context._query_count == 3
+    assert len(caplog.records) == 1
+    assert caplog.records[0].stack_info
+
+
+def test_query_count_uses_outermost_transaction(make_db, engine):
+    make_db(engine=engine, debug_query_count_threshold=10)
+    with local_transaction() as outer:
+        with local_transaction():
+            User.select_count()
+        assert outer._query_count == 1
+
+
+
+def test_query_counter_registered_once_per_engine(make_db, engine):
+    make_db(engine=engine, debug_query_count_threshold=10)
+    with pytest.warns(RuntimeWarning):
+        second = make_db(engine=engine, debug_query_count_threshold=10)
+    with local_transaction():
+        User.select_count()
+        assert get_transaction_context()._query_count == 1
+    second.dispose()
+    assert not event.contains(engine, 'before_cursor_execute', _count_query)
+
+def test_engine_is_reused_per_datasource(make_db, tmp_path):
+    url = f'sqlite:///{tmp_path / "cache.db"}'
+    first = make_db(datasource_url=url)
+    with pytest.warns(RuntimeWarning):
+        second = make_db(datasource_url=url)
+    assert second.engine is first.engine
+    with pytest.warns(RuntimeWarning):
+        other = make_db(datasource_url=f'sqlite:///{tmp_path / "other.db"}')
+    assert other.engine is not first.engine
+
+
+def test_reused_engine_warns_for_different_kwargs(make_db, tmp_path):
+    url = f'sqlite:///{tmp_path / "cache.db"}'
+    first = make_db(datasource_url=url, pool_size=5)
+    with pytest.warns(RuntimeWarning) as record:
+        second = make_db(datasource_url=url, pool_size=10)
+    assert any('引擎参数' in str(warning.message) for warning in record)
+    assert second.engine is first.engine
+    assert second.engine.pool.size() == 5
+    with pytest.warns(RuntimeWarning) as record:
+        make_db(datasource_url=url, pool_size=5)
+    assert not any('引擎参数' in str(warning.message) for warning in record)
+
+
+def test_dispose_resets_extension(tmp_path):
+    url = f'sqlite:///{tmp_path / "dispose.db"}'
+    extension = FastAPIDB(datasource_url=url)
+    engine = extension.engine
+    extension.dispose()
+    with pytest.raises(SessionInitError):
+        ctx.app
+    with pytest.raises(SessionInitError):
+        get_transaction_context()
+    extension = FastAPIDB(datasource_url=url)
+    assert extension.engine is not engine
+    extension.dispose()
+
+
+def test_app_does_not_keep_extension(app, engine):
+    extension = FastAPIDB(app, engine=engine)
+    reference = weakref.ref(extension)
+    extension.dispose()
+    del extension
+    gc.collect()
+    assert reference() is None
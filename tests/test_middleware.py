@@ -0,0 +1,95 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from fastapi_db import FastAPIDBMiddleware, Isolation, ctx, local_transaction, transactional
+from .models import User
+
+
+def _count() -> int:
+    with local_transaction():
+        return User.select_count()
+
+
+def test_request_transaction_commits(app, db):
+    @app.post('/users')
+    def create(username: str):
+        user = User(username=username)
+        user.insert()
+        return user.id
+
+    with TestClient(app) as client:
+        assert client.post('/users', params={'username': 'a'}).json() == 1
+    assert _count() == 1
+
+
+
+def test_request_commits_raw_connection_writes(app, db, engine):
+    @app.post('/raw')
+    def raw():
+        ctx.session.connection().execute(text("INSERT INTO user (username) VALUES ('raw')"))
+
+    with TestClient(app) as client:
+        assert client.post('/raw').status_code == 200
+    with engine.connect() as connection:
+        assert connection.execute(text('SELECT username FROM user')).scalars().all() == ['raw']
+
+
+def test_decorator_isolation_covers_request_transaction(app, db, engine):
+    @app.get('/isolation')
+    @transactional(isolation=Isolation.READ_UNCOMMITTED)
+    def isolation():
+        return ctx.session.connection().get_isolation_level()
+
+    with TestClient(app) as client:
+        assert client.get('/isolation').json() == 'READ UNCOMMITTED'
+    with engine.connect() as connection:
+        assert connection.get_isolation_level() == 'SERIALIZABLE'
+
+def test_request_transaction_rolls_back_on_error(app, db):
+    @app.post('/fail')
+    def fail():
+        User(username='a').insert()
+        raise RuntimeError
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        assert client.post('/fail').status_code == 500
+    assert _count() == 0
+
+
+def test_failed_commit_becomes_error_response(app, db):
+    @app.post('/users')
+    def create(username: str):
+        ctx.session.add(User(username=username))
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        assert client.post('/users', params={'username': 'a'}).status_code == 200
+        assert client.post('/users', params={'username': 'a'}).status_code == 500
+    assert _count() == 1
+
+
+def test_middleware_uses_extension_autocommit(make_db, app, engine):
+    make_db(app, engine=engine, autocommit=False)
+
+    @app.post('/users')
+    def create():
+        User(username='a').insert()
+
+    with TestClient(app) as client:
+        assert client.post('/users').status_code == 200
+    assert _count() == 0
+
+
+def test_middleware_class_finds_fastapi_app(app, engine):
+    app.add_middleware(FastAPIDBMiddleware, engine=engine)
+
+    @app.post('/users')
+    def create():
+        User(username='a').insert()
+
+    with TestClient(app) as client:
+        assert client.post('/users').status_code == 200
+    try:
+        assert app.fastapi_db is ctx.app
+        assert _count() == 1
+    finally:
+        app.fastapi_db.dispose()
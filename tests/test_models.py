@@ -0,0 +1,339 @@
+import pytest
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import event, inspect as sa_inspect
+
+from fastapi_db import Page, ctx, local_transaction
+from .models import Account, Author, Book, Child, Parent, User
+
+
+def _create_family():
+    with local_transaction():
+        ctx.session.add(Parent(children=[Child(), Child()]))
+
+
+def test_eager_loads_relationships(db):
+    _create_family()
+    with local_transaction():
+        [parent] = Parent.select_all(_eager=Parent.children)
+        assert 'children' not in sa_inspect(parent).unloaded
+        assert len(parent.children) == 2
+        [parent] = Parent.select(_eager=(Parent.children,))
+        assert 'children' not in sa_inspect(parent).unloaded
+
+
+def test_joined_loads_relationships(db):
+    _create_family()
+    with local_transaction():
+        children = Child.query(_joined=Child.parent).all()
+        assert len(children) == 2
+        assert all('parent' not in sa_inspect(child).unloaded for child in children)
+
+
+def test_insert_batch_dicts_returns_rows_in_order(db):
+    with local_transaction():
+        results = User.insert_batch([{'username': 'a'}, {'username': 'b'}, {'id': 10, 'username': 'c'}])
+        assert [user.username for user in results] == ['a', 'b', 'c']
+        assert [user.id for user in results] == [1, 2, 3]
+        assert all(user in ctx.session for user in results)
+        assert User.insert_batch([]) == []
+
+
+def test_insert_batch_without_returning_counts_rows(db):
+    with local_transaction():
+        assert User.insert_batch([{'username': 'a'}, {'username': 'b'}], _returning=False) == 2
+        assert User.insert_batch([], _returning=False) == 0
+    with local_transaction():
+        assert User.select_count() == 2
+
+
+def test_columns_are_cached_on_mapping():
+    assert User.primary_column() is User.id
+    assert User.column_list() == list(User.__table__.columns)
+    assert User.column_list() is User.column_list()
+
+
+def _create_users(*usernames):
+    with local_transaction():
+        User.insert_batch([{'username': username} for username in usernames])
+
+
+def test_select_page_with_count_uses_one_query(db, engine):
+    _create_users('a', 'b', 'c')
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    with local_transaction():
+        count, users = User.select_page_with_count(Page(page=1, page_size=2), _order_by=User.id)
+        assert count == 3
+        assert [user.username for user in users] == ['a', 'b']
+    assert len(statements) == 1
+    with local_transaction():
+        count, rows = User.select_page_with_count(Page(page=2, page_size=2), _columns=User.username)
+        assert count == 3
+        assert [tuple(row) for row in rows] == [('c', 3)]
+
+
+def test_select_page_with_count_past_the_end(db):
+    with local_transaction():
+        assert User.select_page_with_count(Page(page=1, page_size=2)) == (0, [])
+    _create_users('a', 'b', 'c')
+    with local_transaction():
+        assert User.select_page_with_count(Page(page=3, page_size=2)) == (3, [])
+
+
+def test_iter_all_streams_in_chunks(db):
+    _create_users('a', 'b', 'c')
+    with local_transaction():
+        users = User.iter_all(User.id > 1, _order_by=User.id, _chunk_size=1)
+        assert [user.username for user in users] == ['b', 'c']
+        assert [tuple(row) for row in User.iter_all(_columns=User.username, username='a')] == [('a',)]
+
+
+def test_exist(db):
+    _create_users('a')
+    with local_transaction():
+        assert User.exist(username='a')
+        assert not User.exist(User.username == 'b')
+        assert User.exist_by_id(1)
+        assert not User.exist_by_id(2)
+        with pytest.deprecated_call():
+            assert User.exit_by_id(1)
+
+
+def test_insert_by_obj_returns_instance(db):
+    with local_transaction():
+        user = User.insert_by_obj({'username': 'a'})
+        assert isinstance(user, User)
+        assert user.id == 1
+
+
+def test_select_batch_ids_from_session(db, engine):
+    _create_users('a', 'b')
+    with local_transaction():
+        loaded = ctx.session.get(User, 2)
+        statements = []
+        event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[3]))
+        users = User.select_batch_ids([2, 1, 3], _from_session=True)
+        assert [user.id for user in users] == [2, 1]
+        assert users[0] is loaded
+        assert statements == [(1, 3)]
+        assert User.select_batch_ids([1, 2], _from_session=True) == [users[1], loaded]
+        assert len(statements) == 1
+
+
+def test_by_id_helpers(db):
+    _create_users('a', 'b', 'c')
+    with local_transaction():
+        assert User.get_by_id(1).username == 'a'
+        assert User.get_by_id(4) is None
+        assert tuple(User.get_by_id(2, User.username)) == ('b',)
+        assert sorted(user.id for user in User.select_batch_ids([1, 3])) == [1, 3]
+        assert User.update_by_id(2, {'username': 'x'}) == 1
+        assert User.delete_by_id(3) == 1
+        assert User.delete_by_id(3) == 0
+    with local_transaction():
+        assert [user.username for user in User.select_all()] == ['a', 'x']
+    assert User._pk_statement('get') is User._pk_statement('get')
+
+
+def test_select_columns_and_order_by(db):
+    _create_users('a', 'b', 'c')
+    with local_transaction():
+        assert [user.username for user in User.select(_order_by=User.id.desc())] == ['c', 'b', 'a']
+        rows = User.select(User.id > 1, _columns=(User.id, User.username), _order_by=(User.username.desc(),))
+        assert [tuple(row) for row in rows] == [(3, 'c'), (2, 'b')]
+        assert User.select_one(username='b', _columns=User.id) == (2,)
+
+
+def test_single_row_lookups(db):
+    _create_users('a', 'b')
+    with local_transaction():
+        assert User.get(username='b').id == 2
+        assert User.get_one(User.id > 0, _order_by=User.id.desc()).username == 'b'
+        assert User.get_by_dict({'username': 'a'}).id == 1
+        assert User.select_one(username='c') is None
+        assert tuple(User.get(User.id == 1, _columns=(User.id, User.username))) == (1, 'a')
+
+
+def test_insert_skips_make_transient_for_new_objects(db, monkeypatch):
+    calls = []
+    monkeypatch.setattr('fastapi_db.models.make_transient', calls.append)
+    with local_transaction():
+        user = User(username='a')
+        user.insert()
+        assert calls == []
+        user.expunge()
+        assert calls == [user]
+
+
+def test_write_helpers_resolve_session_once(db, monkeypatch):
+    calls = []
+
+    def session(cls):
+        calls.append(cls)
+        return ctx.session
+
+    monkeypatch.setattr(User, 'session', classmethod(session))
+    with local_transaction():
+        user = User(username='a')
+        user.insert()
+        user.save()
+        user.delete()
+        assert len(calls) == 3
+
+
+def test_default_entities_per_model():
+    assert User._default_entities == (User,)
+    assert Child._default_entities == (Child,)
+
+
+def test_page_precomputes_offset_and_limit(db):
+    page = Page(page=3, page_size=200)
+    assert (page.offset, page.limit) == (200, 100)
+    page.set_page(1)
+    page.set_page_size(2)
+    assert (page.offset, page.limit) == (0, 2)
+    assert not hasattr(page, '__dict__')
+    _create_users('a', 'b', 'c')
+    with local_transaction():
+        page.set_page(2)
+        assert [user.username for user in User.select_page(page, _order_by=User.id)] == ['c']
+
+
+def test_update_by_ids_count_returned_rows(db, engine):
+    _create_family()
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    with local_transaction():
+        assert Child.update_by_id(1, {Child.parent_id: None}) == 1
+        assert Child.update_by_id(3, {Child.parent_id: None}) == 0
+        assert Child.update_batch_ids([1, 2, 3], {'parent_id': 1}) == 2
+    updates = [statement for statement in statements if statement.startswith('UPDATE')]
+    assert len(updates) == 3
+    assert all('RETURNING' in statement for statement in updates)
+
+
+def test_insert_batch_adds_model_instances(db):
+    with local_transaction():
+        user = User(username='instance')
+        results = User.insert_batch([{'username': 'dict'}, user])
+        assert results[1] is user
+        assert user.id is not None
+        assert user in ctx.session
+        assert [result.username for result in results] == ['dict', 'instance']
+
+
+def test_insert_batch_keeps_relationships(db):
+    with local_transaction():
+        Parent.insert_batch([Parent(children=[Child(), Child()])])
+    with local_transaction():
+        assert Child.select_count() == 2
+        assert Child.select_count(Child.parent_id.is_(None)) == 0
+
+
+def test_primary_column_uses_attribute_key(db):
+    assert Account.primary_column() is Account.id
+    assert Account.primary_column().key == 'id'
+    with local_transaction():
+        account = Account(name='a')
+        account.id = 100
+        Account.insert_batch([account, {'id': 200, 'name': 'b'}])
+        assert account.id != 100
+        [inserted] = Account.insert_batch([{'id': 300, 'name': 'c'}])
+        assert inserted.id not in (100, 200, 300)
+        assert Account.get_by_id(account.id) is account
+
+
+def test_select_batch_ids_from_session_coerces_ids(db):
+    _create_users('a', 'b')
+    with local_transaction():
+        loaded = User.get_by_id(2)
+        users = User.select_batch_ids(['2', '1'], _from_session=True)
+        assert [user.id for user in users] == [2, 1]
+        assert users[0] is loaded
+
+
+def test_select_batch_ids_from_session_with_column_name(db):
+    with local_transaction():
+        Account.insert_batch([{'name': 'a'}, {'name': 'b'}])
+    with local_transaction():
+        loaded = Account.get_by_id(1)
+        accounts = Account.select_batch_ids([2, 1], _from_session=True)
+        assert [account.id for account in accounts] == [2, 1]
+        assert accounts[1] is loaded
+
+
+class SmallPage(Page):
+    __slots__ = ()
+
+    def get_page_size_max(self) -> int:
+        return 1
+
+
+def test_page_subclass_getters_are_used(db):
+    _create_users('a', 'b', 'c')
+    with local_transaction():
+        assert len(User.select_page(SmallPage(page=2, page_size=20))) == 1
+        assert len(User.select_page(Page(page=1, page_size=2))) == 2
+
+
+def _create_authors():
+    with local_transaction():
+        ctx.session.add_all([Author(books=[Book(), Book()]), Author(books=[Book()])])
+
+
+def test_by_id_helpers_with_joined_collection(db):
+    _create_authors()
+    with local_transaction():
+        assert len(Author.get_by_id(1).books) == 2
+        authors = Author.select_batch_ids([1, 2])
+        assert sorted(len(author.books) for author in authors) == [1, 2]
+
+
+def test_delete_by_id_removes_loaded_object(db):
+    _create_users('a', 'b')
+    with local_transaction():
+        user = User.get_by_id(1)
+        assert User.delete_by_id(1) == 1
+        assert user not in ctx.session
+        user.username = 'x'
+        ctx.session.flush()
+    with local_transaction():
+        assert [user.username for user in User.select_all()] == ['b']
+
+
+def test_single_row_lookups_with_joined_collection(db):
+    _create_authors()
+    with local_transaction():
+        assert len(Author.get(id=1).books) == 2
+        assert len(Author.get_one(Author.id == 2).books) == 1
+        assert len(Author.select_one(_order_by=Author.id).books) == 2
+        assert len(Author.get_by_dict({'id': 1}).books) == 2
+        assert tuple(Author.get_by_id(1, Author.id)) == (1,)
+
+
+def test_page_assignment_recomputes_offset_and_limit():
+    page = Page(page=1, page_size=10)
+    page.page = 3
+    assert (page.offset, page.limit) == (20, 10)
+    page.page_size_max = 5
+    assert (page.offset, page.limit) == (10, 5)
+
+
+def test_page_dependency_does_not_expose_page_size_max(app):
+    @app.get('/page')
+    def paginate(page: Page = Depends()):
+        return [page.page, page.limit]
+
+    with TestClient(app) as client:
+        response = client.get('/page', params={'page': 2, 'page_size': 1000, 'page_size_max': 1000})
+        assert response.json() == [2, 100]
+
+
+@pytest.mark.parametrize('objects', [[{'username': 'a', 'unknown': 1}], [User(username='b'), {'unknown': 1}]])
+def test_insert_batch_rejects_unknown_keys(db, objects):
+    with local_transaction():
+        with pytest.raises(TypeError, match='unknown'):
+            User.insert_batch(objects)
+        with pytest.raises(TypeError, match='unknown'):
+            User.insert_batch(objects, _returning=False)
@@ -0,0 +1,250 @@
+import inspect
+import threading
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import IntegrityError
+
+from fastapi_db import (Isolation, Propagation, ctx, get_transaction_context,
+                        local_transaction, transaction_pop, transactional)
+from fastapi_db.exceptions import SessionContextError
+from fastapi_db.extensions import _transaction_context
+from .models import User
+
+
+def test_local_transaction_commits(db):
+    with local_transaction():
+        User(username='a').insert()
+    with local_transaction():
+        assert User.select_count() == 1
+
+
+def test_local_transaction_rolls_back_on_error(db):
+    with pytest.raises(ValueError):
+        with local_transaction():
+            User(username='a').insert()
+            raise ValueError
+    with local_transaction():
+        assert User.select_count() == 0
+
+
+def test_nested_required_exit_keeps_outer_transaction(db):
+    @transactional()
+    def inner():
+        User(username='inner').insert()
+
+    with local_transaction() as context:
+        inner()
+        assert ctx.context is context
+        User(username='outer').insert()
+    with local_transaction():
+        assert User.select_count() == 2
+
+
+def test_new_propagation_uses_own_session(db):
+    sessions = []
+
+    @transactional(propagation=Propagation.NEW)
+    def new():
+        sessions.append(ctx.session)
+
+    with local_transaction():
+        new()
+        assert sessions[0] is not ctx.session
+
+
+def test_sessions_are_not_shared_across_threads(db):
+    barrier = threading.Barrier(2)
+    sessions = []
+
+    def run():
+        with local_transaction():
+            sessions.append(ctx.session)
+            barrier.wait(timeout=5)
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(sessions) == 2
+    assert sessions[0] is not sessions[1]
+    assert db.session_factory() is not db.session_factory()
+
+
+def test_failed_session_build_pops_context(db):
+    with pytest.raises(SessionContextError):
+        with local_transaction(propagation=Propagation.MANDATORY):
+            pass
+    with pytest.raises(SessionContextError):
+        get_transaction_context()
+
+
+def test_transactional_accepts_enum_values(db):
+    sessions = []
+
+    @transactional(propagation='new', isolation='DEFAULT')
+    def new():
+        sessions.append(ctx.session)
+
+    with local_transaction():
+        new()
+        assert sessions[0] is not ctx.session
+
+
+def test_transactional_rejects_unknown_enum_value():
+    with pytest.raises(ValueError):
+        transactional(propagation='unknown')
+
+
+def test_transaction_pop_without_transaction(db):
+    assert transaction_pop() is None
+    with pytest.raises(SessionContextError):
+        get_transaction_context()
+
+
+def test_transaction_pop_commits_and_pops(db):
+    manager = local_transaction()
+    manager.__enter__()
+    User(username='a').insert()
+    transaction_pop()
+    with pytest.raises(SessionContextError):
+        get_transaction_context()
+    with local_transaction():
+        assert User.select_count() == 1
+
+
+def test_transaction_objects_have_no_instance_dict(db):
+    manager = local_transaction()
+    with manager as context:
+        assert not hasattr(context, '__dict__')
+    assert not hasattr(manager, '__dict__')
+    assert not hasattr(ctx, '__dict__')
+
+
+def _depth() -> int:
+    return len(_transaction_context.get())
+
+
+def test_required_joins_parent_context_and_pops(db):
+    with local_transaction() as outer:
+        with local_transaction(propagation=Propagation.REQUIRED) as joined:
+            assert joined is outer
+            assert _depth() == 2
+            with local_transaction(propagation=Propagation.MANDATORY) as mandatory:
+                assert mandatory is outer
+                assert _depth() == 3
+            assert _depth() == 2
+        assert _depth() == 1
+        assert ctx.context is outer
+        assert outer.session is not None
+    assert _depth() == 0
+
+
+def test_joined_exit_leaves_commit_to_parent(db):
+    with pytest.raises(ValueError):
+        with local_transaction():
+            with local_transaction(propagation=Propagation.REQUIRED):
+                User(username='joined').insert()
+            assert ctx.session.in_transaction()
+            raise ValueError
+    with local_transaction():
+        assert User.select_count() == 0
+
+
+def test_new_inside_joined_returns_to_parent(db):
+    with local_transaction() as outer:
+        with local_transaction(propagation=Propagation.REQUIRED):
+            with local_transaction(propagation=Propagation.NEW) as new:
+                assert new is not outer
+                assert new.session is not outer.session
+            assert ctx.context is outer
+        assert _depth() == 1
+
+
+def test_local_isolation_is_reset_on_checkin(db, engine):
+    with local_transaction(isolation=Isolation.READ_UNCOMMITTED) as context:
+        assert context.is_active_isolation
+        assert ctx.session.connection().get_isolation_level() == 'READ UNCOMMITTED'
+    with engine.connect() as connection:
+        assert connection.get_isolation_level() == 'SERIALIZABLE'
+
+
+def test_proxy_reads_current_transaction(db):
+    assert ctx.app is db
+    with pytest.raises(SessionContextError):
+        ctx.session
+    with local_transaction() as context:
+        assert ctx.context is context
+        assert ctx.session is context.session
+
+
+def test_proxy_follows_new_extension(db, make_db, engine):
+    with pytest.warns(RuntimeWarning):
+        extension = make_db(engine=engine)
+    assert ctx.app is extension
+
+
+def test_exit_closes_session_and_clears_slot(db):
+    with local_transaction() as context:
+        session = context.session
+        User(username='a').insert()
+    assert context.session is None
+    assert not session.in_transaction()
+    assert len(session.identity_map) == 0
+
+
+def test_failed_commit_still_pops(db):
+    with pytest.raises(IntegrityError):
+        with local_transaction():
+            ctx.session.add_all([User(username='a'), User(username='a')])
+    assert _depth() == 0
+
+
+def test_transactional_keeps_signature(db):
+    @transactional()
+    def create(username, /, *, flush=True):
+        User(username=username).insert(flush=flush)
+        return ctx.session
+
+    assert str(inspect.signature(create, follow_wrapped=False)) == '(username, /, *, flush=True)'
+    with local_transaction():
+        assert create('a') is ctx.session
+        assert User.select_count() == 1
+
+
+def test_joined_transactional_does_not_push(db):
+    depths = []
+
+    @transactional()
+    def required():
+        depths.append(_depth())
+
+    @transactional(propagation=Propagation.MANDATORY)
+    def mandatory():
+        depths.append(_depth())
+
+    with local_transaction():
+        required()
+        mandatory()
+    assert depths == [1, 1]
+    with pytest.raises(SessionContextError):
+        mandatory()
+
+
+def test_unused_session_is_not_committed(db):
+    commits = []
+    with local_transaction() as context:
+        event.listen(context.session, 'after_commit', commits.append)
+    assert commits == []
+    with local_transaction() as context:
+        event.listen(context.session, 'after_commit', commits.append)
+        User.select_count()
+    assert len(commits) == 1
+
+
+def test_local_transaction_commits_raw_connection_writes(db, engine):
+    with local_transaction():
+        ctx.session.connection().execute(text("INSERT INTO user (username) VALUES ('raw')"))
+    with engine.connect() as connection:
+        assert connection.execute(text('SELECT COUNT(*) FROM user')).scalar() == 1
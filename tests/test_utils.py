@@ -0,0 +1,254 @@
+import asyncio
+import enum
+import inspect
+
+import pytest
+from sqlalchemy import Column, Enum, ForeignKey, Integer, String, func
+from sqlalchemy.dialects.postgresql import psycopg2
+from sqlalchemy.orm import column_property
+
+from fastapi_db import Isolation, Model, Propagation
+from fastapi_db.utils import _as_tuple, _copy_rows, _deserialize_enum, _empty_primary, _make_wrapper, _value_map
+
+
+def test_deserialize_enum():
+    assert _deserialize_enum(Propagation, 'new') is Propagation.NEW
+    assert _deserialize_enum(Isolation, Isolation.SERIALIZABLE) is Isolation.SERIALIZABLE
+    with pytest.raises(ValueError):
+        _deserialize_enum(Propagation, 'unknown')
+
+
+def test_value_map_is_built_once_per_enum():
+    assert _value_map(Isolation) is _value_map(Isolation)
+    assert _value_map(Isolation)['READ COMMITTED'] is Isolation.READ_COMMITTED
+
+
+class CopyRow(Model):
+    __tablename__ = 'copy_row'
+    id = Column(Integer, primary_key=True)
+    name = Column(String(32))
+    amount = Column(Integer)
+    status = Column(Integer, default=7)
+
+
+class Color(enum.Enum):
+    RED = 'red'
+
+
+class CopyEnum(Model):
+    __tablename__ = 'copy_enum'
+    id = Column(Integer, primary_key=True)
+    color = Column(Enum(Color))
+
+
+class CopyCallableDefault(Model):
+    __tablename__ = 'copy_callable_default'
+    id = Column(Integer, primary_key=True)
+    name = Column(String(32))
+    status = Column(Integer, default=lambda: 1)
+
+
+class CopyBase(Model):
+    """单表继承，写入时需要多态标识"""
+    __tablename__ = 'copy_base'
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(16))
+    name = Column(String(32))
+    __mapper_args__ = {'polymorphic_on': kind, 'polymorphic_identity': 'base'}
+
+
+class CopySingle(CopyBase):
+    __mapper_args__ = {'polymorphic_identity': 'single'}
+
+
+class CopyJoined(CopyBase):
+    """连接表继承，一行写入两张表"""
+    __tablename__ = 'copy_joined'
+    id = Column(Integer, ForeignKey('copy_base.id'), primary_key=True)
+    extra = Column(String(32))
+    __mapper_args__ = {'polymorphic_identity': 'joined'}
+
+
+class CopyColumnProperty(Model):
+    __tablename__ = 'copy_column_property'
+    id = Column(Integer, primary_key=True)
+    name = Column(String(32))
+    upper_name = column_property(func.upper(name))
+
+
+class FakeCursor:
+    def __init__(self):
+        self.copies = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def copy_expert(self, statement, buffer):
+        self.copies.append((statement, buffer.read()))
+
+
+class FakeConnection:
+    """同时充当SQLAlchemy连接和其包装的DBAPI连接"""
+
+    def __init__(self, cursor: FakeCursor):
+        self.connection = self
+        self._cursor = cursor
+
+    def cursor(self) -> FakeCursor:
+        return self._cursor
+
+
+class FakeSession:
+    """只提供_copy_rows用到的psycopg2方言和原始游标"""
+
+    def __init__(self):
+        self.dialect = psycopg2.dialect()
+        self.cursor = FakeCursor()
+
+    def get_bind(self):
+        return self
+
+    def connection(self) -> FakeConnection:
+        return FakeConnection(self.cursor)
+
+
+def _copy(cls, rows):
+    session = FakeSession()
+    return _copy_rows(session, cls, rows), session.cursor.copies
+
+
+def test_copy_rows_follows_first_row_key_order():
+    copied, copies = _copy(CopyRow, [{'name': 'a', 'amount': 1}, {'amount': 2, 'name': None}])
+    assert copied
+    [(statement, data)] = copies
+    assert statement == 'COPY copy_row (name, amount, status) FROM STDIN WITH (FORMAT csv)'
+    assert data == '"a","1","7"\n,"2","7"\n'
+
+
+def test_copy_rows_falls_back_for_mismatched_rows():
+    assert _copy(CopyRow, [{'name': 'a'}, {'amount': 2}]) == (False, [])
+    assert _copy(CopyRow, [{'name': 'a', 'unknown': 1}]) == (False, [])
+
+
+def test_copy_rows_falls_back_for_processed_types():
+    assert _copy(CopyEnum, [{'color': Color.RED}]) == (False, [])
+
+
+def test_copy_rows_falls_back_for_callable_defaults():
+    assert _copy(CopyCallableDefault, [{'name': 'a'}]) == (False, [])
+
+
+@pytest.mark.parametrize('cls', [CopyBase, CopySingle, CopyJoined])
+def test_copy_rows_falls_back_for_inheritance(cls):
+    assert _copy(cls, [{'name': 'a'}]) == (False, [])
+
+
+def test_copy_rows_falls_back_for_column_property():
+    assert _copy(CopyColumnProperty, [{'name': 'a'}]) == (False, [])
+
+
+def test_empty_primary():
+    row = {'id': 1, 'name': 'a'}
+    _empty_primary(CopyRow, row)
+    assert row == {'id': None, 'name': 'a'}
+    obj = CopyRow(id=1)
+    _empty_primary(CopyRow, obj)
+    assert obj.id is None
+
+
+def test_as_tuple():
+    columns = (CopyRow.id, CopyRow.name)
+    assert _as_tuple(None) == ()
+    assert _as_tuple(columns) is columns
+    assert _as_tuple(CopyRow.id) == (CopyRow.id,)
+
+
+class Manager:
+    """记录进入次数的事务管理器替身"""
+
+    entered = 0
+
+    def __enter__(self):
+        Manager.entered += 1
+
+    def __exit__(self, *args):
+        pass
+
+    async def __aenter__(self):
+        Manager.entered += 1
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def _signature(wrapper) -> str:
+    return str(inspect.signature(wrapper, follow_wrapped=False))
+
+
+def test_make_wrapper_positional_only():
+    def func(a, b, /, c):
+        return a, b, c
+
+    wrapper = _make_wrapper(func, Manager)
+    assert _signature(wrapper) == '(a, b, /, c)'
+    assert wrapper(1, 2, c=3) == (1, 2, 3)
+
+
+def test_make_wrapper_keyword_only_and_defaults():
+    default = []
+
+    def func(a, b=2, *, c, d=default, **kwargs):
+        return a, b, c, d, kwargs
+
+    wrapper = _make_wrapper(func, Manager)
+    assert _signature(wrapper) == '(a, b=2, *, c, d=[], **kwargs)'
+    assert wrapper(1, c=3) == (1, 2, 3, [], {})
+    assert wrapper(1, 4, c=3, e=5)[4] == {'e': 5}
+    assert wrapper(1, c=3)[3] is default
+
+
+def test_make_wrapper_var_positional():
+    def func(a, *args, b=1):
+        return a, args, b
+
+    assert _make_wrapper(func, Manager)(1, 2, 3, b=4) == (1, (2, 3), 4)
+
+
+def test_make_wrapper_reserved_names_fall_back():
+    def func(_func, _d0=1):
+        return _func, _d0
+
+    wrapper = _make_wrapper(func, Manager)
+    assert _signature(wrapper) == '(*args, **kwargs)'
+    assert wrapper(5) == (5, 1)
+    assert wrapper(_func=5, _d0=2) == (5, 2)
+
+
+def test_make_wrapper_enters_manager():
+    entered = Manager.entered
+    wrapper = _make_wrapper(lambda x: x * 2, Manager)
+    assert wrapper(3) == 6
+    assert Manager.entered == entered + 1
+    assert wrapper.__wrapped__(3) == 6
+
+
+def test_make_wrapper_async():
+    async def func(a, *, b=2):
+        return a + b
+
+    async def enter():
+        return Manager()
+
+    wrapper = _make_wrapper(func, enter, is_async=True)
+    assert _signature(wrapper) == '(a, *, b=2)'
+    assert asyncio.run(wrapper(1)) == 3
+
+
+def test_make_wrapper_skips_manager_when_enter_returns_none():
+    entered = Manager.entered
+    wrapper = _make_wrapper(lambda x: x * 2, lambda: None)
+    assert wrapper(3) == 6
+    assert Manager.entered == entered